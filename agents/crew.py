@@ -19,7 +19,7 @@ from db.database import (
     get_pending_suggestions,
     get_all_members,
     get_audit_log,
-    get_connection, USE_POSTGRES,
+    connection, as_dicts, USE_POSTGRES,
     get_schedule, get_milestones, get_active_alerts,
     init_schedule_tables
 )
@@ -83,97 +83,85 @@ def build_estate_context(estate_id: int) -> dict:
     Pull the full current state of the estate into a structured dict.
     Morris reads this before every briefing or conversation.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-
-    # Family members
-    c.execute(f"""
-        SELECT name, email, role, status, invited_at, joined_at
-        FROM family_members WHERE estate_id={p}
-        ORDER BY role, name
-    """, (estate_id,))
-    rows = c.fetchall()
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        members = [dict(zip(cols, r)) for r in rows]
-    else:
-        members = [dict(r) for r in rows]
-
-    not_joined = [m for m in members if m['status'] == 'invited']
-    joined = [m for m in members if m['status'] == 'joined']
-
-    # Inventory
-    c.execute(f"""
-        SELECT id, name, status, category, estimated_value
-        FROM inventory_items WHERE estate_id={p}
-    """, (estate_id,))
-    rows = c.fetchall()
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        items = [dict(zip(cols, r)) for r in rows]
-    else:
-        items = [dict(r) for r in rows]
-
-    total_items = len(items)
-    distributed = sum(1 for i in items if i['status'] == 'distributed')
-    unclaimed = sum(1 for i in items if i['status'] == 'unclaimed')
-
-    # Active conflicts (items with 2+ pending claims)
-    c.execute(f"""
-        SELECT i.id, i.name,
-               array_agg(cl.member_name) as claimants
-        FROM inventory_items i
-        JOIN claims cl ON cl.item_id = i.id
-        WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
-        GROUP BY i.id, i.name
-        HAVING COUNT(cl.id) > 1
-        ORDER BY COUNT(cl.id) DESC
-    """ if USE_POSTGRES else f"""
-        SELECT i.id, i.name,
-               GROUP_CONCAT(cl.member_name, ', ') as claimants
-        FROM inventory_items i
-        JOIN claims cl ON cl.item_id = i.id
-        WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
-        GROUP BY i.id, i.name
-        HAVING COUNT(cl.id) > 1
-        ORDER BY COUNT(cl.id) DESC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conflicts = [
-        {'id': r[0], 'name': r[1], 'claimants': r[2]}
-        for r in rows
-    ]
-
-    # Pending suggestions
-    c.execute(f"""
-        SELECT name, suggested_by_name, created_at
-        FROM item_suggestions
-        WHERE estate_id={p} AND status='pending'
-        ORDER BY created_at ASC
-    """, (estate_id,))
-    rows = c.fetchall()
-    pending_suggestions = [
-        {'name': r[0], 'suggested_by': r[1], 'created_at': r[2]}
-        for r in rows
-    ]
-
-    # Recent audit activity (last 24 hours)
-    yesterday = (datetime.now() - timedelta(hours=24)).isoformat()
-    c.execute(f"""
-        SELECT actor_name, public_summary, created_at
-        FROM audit_log
-        WHERE estate_id={p} AND created_at > {p}
-        ORDER BY created_at DESC
-        LIMIT 15
-    """, (estate_id, yesterday))
-    rows = c.fetchall()
-    recent_activity = [
-        {'actor': r[0], 'summary': r[1], 'at': r[2]}
-        for r in rows
-    ]
-
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        p = '%s' if USE_POSTGRES else '?'
+
+        # Family members
+        c.execute(f"""
+            SELECT name, email, role, status, invited_at, joined_at
+            FROM family_members WHERE estate_id={p}
+            ORDER BY role, name
+        """, (estate_id,))
+        members = as_dicts(c.fetchall())
+
+        not_joined = [m for m in members if m['status'] == 'invited']
+        joined = [m for m in members if m['status'] == 'joined']
+
+        # Inventory
+        c.execute(f"""
+            SELECT id, name, status, category, estimated_value
+            FROM inventory_items WHERE estate_id={p}
+        """, (estate_id,))
+        items = as_dicts(c.fetchall())
+
+        total_items = len(items)
+        distributed = sum(1 for i in items if i['status'] == 'distributed')
+        unclaimed = sum(1 for i in items if i['status'] == 'unclaimed')
+
+        # Active conflicts (items with 2+ pending claims)
+        c.execute(f"""
+            SELECT i.id, i.name,
+                   array_agg(cl.member_name) as claimants
+            FROM inventory_items i
+            JOIN claims cl ON cl.item_id = i.id
+            WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
+            GROUP BY i.id, i.name
+            HAVING COUNT(cl.id) > 1
+            ORDER BY COUNT(cl.id) DESC
+        """ if USE_POSTGRES else f"""
+            SELECT i.id, i.name,
+                   GROUP_CONCAT(cl.member_name, ', ') as claimants
+            FROM inventory_items i
+            JOIN claims cl ON cl.item_id = i.id
+            WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
+            GROUP BY i.id, i.name
+            HAVING COUNT(cl.id) > 1
+            ORDER BY COUNT(cl.id) DESC
+        """, (estate_id,))
+        rows = c.fetchall()
+        conflicts = [
+            {'id': r['id'], 'name': r['name'], 'claimants': r['claimants']}
+            for r in rows
+        ]
+
+        # Pending suggestions
+        c.execute(f"""
+            SELECT name, suggested_by_name, created_at
+            FROM item_suggestions
+            WHERE estate_id={p} AND status='pending'
+            ORDER BY created_at ASC
+        """, (estate_id,))
+        rows = c.fetchall()
+        pending_suggestions = [
+            {'name': r['name'], 'suggested_by': r['suggested_by_name'], 'created_at': r['created_at']}
+            for r in rows
+        ]
+
+        # Recent audit activity (last 24 hours)
+        yesterday = (datetime.now() - timedelta(hours=24)).isoformat()
+        c.execute(f"""
+            SELECT actor_name, public_summary, created_at
+            FROM audit_log
+            WHERE estate_id={p} AND created_at > {p}
+            ORDER BY created_at DESC
+            LIMIT 15
+        """, (estate_id, yesterday))
+        rows = c.fetchall()
+        recent_activity = [
+            {'actor': r['actor_name'], 'summary': r['public_summary'], 'at': r['created_at']}
+            for r in rows
+        ]
 
     return {
         'members': members,
@@ -360,6 +348,50 @@ def run_suggestion_notification(
     Crew(agents=[agent], tasks=[task], verbose=True).kickoff()
 
 
+def run_suggestion_notifications_batch(
+    estate_id: int,
+    estate_name: str,
+    suggestions: list
+):
+    """
+    One notification covering every new suggestion since the last check,
+    instead of a message per suggestion.
+    suggestions: item_suggestions rows (name, suggested_by_name).
+    """
+    ctx = build_estate_context(estate_id)
+    pending_count = len(ctx['pending_suggestions'])
+    new_items = '\n'.join(
+        f"- \"{s['name']}\" from {s['suggested_by_name']}" for s in suggestions
+    )
+    llm = make_llm()
+
+    agent = Agent(
+        role="Morris — FM Estate Coordinator",
+        goal="Notify the executor of new item suggestions, briefly and clearly.",
+        backstory=MORRIS_CHARACTER,
+        tools=[send_telegram_tool],
+        llm=llm,
+        verbose=True
+    )
+
+    task = Task(
+        description=(
+            f"Family members just suggested adding these items to the "
+            f"{estate_name} estate inventory:\n{new_items}\n\n"
+            f"There are now {pending_count} suggestion(s) awaiting your review.\n\n"
+            "Send the executor one brief, warm notification. Mention the items and "
+            "who suggested them. Let them know they can review them at "
+            "app.familymatter.co. Keep it to two to four sentences. "
+            "No need to be formal — this is a heads-up between colleagues. "
+            "Sign off as Morris."
+        ),
+        expected_output="Suggestion notification sent via Telegram.",
+        agent=agent
+    )
+
+    Crew(agents=[agent], tasks=[task], verbose=True).kickoff()
+
+
 def run_executor_reply(
     user_message: str,
     estate_id: int,
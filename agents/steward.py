@@ -9,7 +9,7 @@ Never talks to the executor directly — reports to Morris.
 
 from datetime import datetime, timedelta
 from db.database import (
-    get_connection, USE_POSTGRES,
+    connection, as_dicts, USE_POSTGRES,
     get_schedule, get_milestones, complete_milestone,
     write_alert, resolve_alert_type, get_active_alerts,
     get_pending_suggestions, get_all_members
@@ -34,58 +34,54 @@ THRESHOLDS = {
 
 def read_estate_state(estate_id: int) -> dict:
     """Pull all time-relevant estate facts into one dict."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now_str = datetime.now().isoformat()
-
-    # Members
-    c.execute(f"""
-        SELECT name, email, role, status, invited_at, joined_at
-        FROM family_members WHERE estate_id={p}
-    """, (estate_id,))
-    rows = c.fetchall()
-    cols = [d[0] for d in c.description]
-    members = [dict(zip(cols, r)) for r in rows]
-
-    # Inventory
-    c.execute(f"""
-        SELECT COUNT(*) FROM inventory_items WHERE estate_id={p}
-    """, (estate_id,))
-    total_items = c.fetchone()[0]
-
-    # Conflicts (items with 2+ pending claims)
-    if USE_POSTGRES:
+    with connection() as conn:
+        c = conn.cursor()
+        p = '%s' if USE_POSTGRES else '?'
+        now_str = datetime.now().isoformat()
+
+        # Members
+        c.execute(f"""
+            SELECT name, email, role, status, invited_at, joined_at
+            FROM family_members WHERE estate_id={p}
+        """, (estate_id,))
+        members = as_dicts(c.fetchall())
+
+        # Inventory
         c.execute(f"""
-            SELECT i.id, i.name, MIN(cl.created_at) as oldest_claim
-            FROM inventory_items i
-            JOIN claims cl ON cl.item_id = i.id
-            WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
-            GROUP BY i.id, i.name HAVING COUNT(cl.id) > 1
+            SELECT COUNT(*) AS n FROM inventory_items WHERE estate_id={p}
         """, (estate_id,))
-    else:
+        total_items = c.fetchone()['n']
+
+        # Conflicts (items with 2+ pending claims)
+        if USE_POSTGRES:
+            c.execute(f"""
+                SELECT i.id, i.name, MIN(cl.created_at) as oldest_claim
+                FROM inventory_items i
+                JOIN claims cl ON cl.item_id = i.id
+                WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
+                GROUP BY i.id, i.name HAVING COUNT(cl.id) > 1
+            """, (estate_id,))
+        else:
+            c.execute(f"""
+                SELECT i.id, i.name, MIN(cl.created_at) as oldest_claim
+                FROM inventory_items i
+                JOIN claims cl ON cl.item_id = i.id
+                WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
+                GROUP BY i.id, i.name HAVING COUNT(cl.id) > 1
+            """, (estate_id,))
+        rows = c.fetchall()
+        conflicts = [{'id': r['id'], 'name': r['name'], 'oldest_claim': r['oldest_claim']} for r in rows]
+
+        # Pending suggestions
         c.execute(f"""
-            SELECT i.id, i.name, MIN(cl.created_at) as oldest_claim
-            FROM inventory_items i
-            JOIN claims cl ON cl.item_id = i.id
-            WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
-            GROUP BY i.id, i.name HAVING COUNT(cl.id) > 1
+            SELECT id, name, suggested_by_name, created_at
+            FROM item_suggestions WHERE estate_id={p} AND status='pending'
         """, (estate_id,))
-    rows = c.fetchall()
-    conflicts = [{'id': r[0], 'name': r[1], 'oldest_claim': r[2]} for r in rows]
-
-    # Pending suggestions
-    c.execute(f"""
-        SELECT id, name, suggested_by_name, created_at
-        FROM item_suggestions WHERE estate_id={p} AND status='pending'
-    """, (estate_id,))
-    rows = c.fetchall()
-    pending_suggestions = [
-        {'id': r[0], 'name': r[1], 'by': r[2], 'created_at': r[3]}
-        for r in rows
-    ]
-
-    conn.close()
+        rows = c.fetchall()
+        pending_suggestions = [
+            {'id': r['id'], 'name': r['name'], 'by': r['suggested_by_name'], 'created_at': r['created_at']}
+            for r in rows
+        ]
 
     return {
         'members': members,
@@ -237,23 +233,22 @@ def check_milestones(estate_id: int):
 
 def check_inactivity(estate_id: int):
     """Flag if the estate has gone quiet for too long."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-
-    c.execute(f"""
-        SELECT created_at FROM audit_log
-        WHERE estate_id={p}
-        ORDER BY created_at DESC LIMIT 1
-    """, (estate_id,))
-    row = c.fetchone()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        p = '%s' if USE_POSTGRES else '?'
+
+        c.execute(f"""
+            SELECT created_at FROM audit_log
+            WHERE estate_id={p}
+            ORDER BY created_at DESC LIMIT 1
+        """, (estate_id,))
+        row = c.fetchone()
 
     if not row:
         return
 
     try:
-        last_activity = datetime.fromisoformat(row[0])
+        last_activity = datetime.fromisoformat(row['created_at'])
     except Exception:
         return
 
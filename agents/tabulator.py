@@ -10,16 +10,19 @@ from crewai.tools import tool
 from dotenv import load_dotenv
 
 from db.database import (
+    connection,
     add_item,
+    add_items_bulk,
     add_claim,
     get_item_claims,
     get_estate_inventory,
     resolve_claim,
     get_fairness_summary,
+    get_conflicts,
+    get_status_bundle,
     get_audit_log,
     write_audit,
-    init_tabulator_tables,
-    init_audit_tables
+    write_audit_many
 )
 
 load_dotenv()
@@ -67,6 +70,45 @@ def make_llm():
     )
 
 
+# ── Formatting ────────────────────────────────────────────────────────────────
+
+def _fmt_item(item: dict) -> str:
+    val = f"~${item['estimated_value']:.0f}" if item['estimated_value'] else "unvalued"
+    loc = f" ({item['location']})" if item.get('location') else ""
+    return f"[{item['id']}] {item['name']} — {item['status']} — {val}{loc}"
+
+
+def _fmt_claim(claim: dict) -> str:
+    note = f" — \"{claim['note']}\"" if claim.get('note') else ""
+    return f"- {claim['member_name']}: {claim['claim_type']} (priority {claim['priority']}){note}"
+
+
+def _fmt_summary(row: dict) -> str:
+    return f"- {row['member_name']}: {row['item_count']} item(s), ~${float(row['total_value']):.0f} total"
+
+
+def format_inventory(estate_id: int, items: list) -> str:
+    if not items:
+        return f"No items found for estate {estate_id}."
+    return f"{len(items)} item(s):\n" + "\n".join(map(_fmt_item, items))
+
+
+def format_fairness(summary: list) -> str:
+    if not summary:
+        return "No distributions recorded yet."
+    return "Distribution summary:\n" + "\n".join(map(_fmt_summary, summary))
+
+
+def format_conflicts(conflicts: list) -> str:
+    if not conflicts:
+        return "No conflicts found."
+    lines = [
+        f"- Item [{row['id']}] '{row['name']}': {row['claim_count']} claimants"
+        for row in conflicts
+    ]
+    return f"⚠️ {len(conflicts)} conflict(s):\n" + "\n".join(lines)
+
+
 # ── Tools ─────────────────────────────────────────────────────────────────────
 
 @tool("Add Inventory Item")
@@ -80,8 +122,6 @@ def add_item_tool(
     added_by: str = "Morris"
 ) -> str:
     """Add an item to the estate inventory and write an audit entry."""
-    init_tabulator_tables()
-    init_audit_tables()
     item_id = add_item(estate_id, name, description, location, category, estimated_value)
     write_audit(
         estate_id=estate_id,
@@ -146,7 +186,6 @@ def record_claim_tool(
 @tool("Resolve Distribution")
 def resolve_tool(
     item_id: int,
-    estate_id: int,
     winner_member_id: int,
     winner_name: str,
     method: str,
@@ -157,7 +196,9 @@ def resolve_tool(
     Record that an item has been distributed to a family member.
     method: 'unanimous' | 'lottery' | 'buyout' | 'gifted' | 'donated' | 'sold'
     """
-    resolve_claim(item_id, winner_member_id, winner_name, method, value)
+    estate_id = resolve_claim(item_id, winner_member_id, winner_name, method, value)
+    if estate_id is None:
+        return f"Item {item_id} not found."
     write_audit(
         estate_id=estate_id,
         item_id=item_id,
@@ -201,113 +242,83 @@ def get_claims_tool(item_id: int) -> str:
     claims = get_item_claims(item_id)
     if not claims:
         return f"No claims on item {item_id}."
-    lines = [
-        f"- {c['member_name']}: {c['claim_type']} (priority {c['priority']})"
-        + (f" — \"{c['note']}\"" if c.get('note') else "")
-        for c in claims
-    ]
-    return f"{len(claims)} claim(s):\n" + "\n".join(lines)
+    return f"{len(claims)} claim(s):\n" + "\n".join(map(_fmt_claim, claims))
 
 
 @tool("Get Estate Inventory")
 def get_inventory_tool(estate_id: int, status: str = "") -> str:
     """Get all items in an estate inventory."""
     items = get_estate_inventory(estate_id, status if status else None)
-    if not items:
-        return f"No items found for estate {estate_id}."
-    lines = []
-    for item in items:
-        val = f"~${item['estimated_value']:.0f}" if item['estimated_value'] else "unvalued"
-        lines.append(
-            f"[{item['id']}] {item['name']} — {item['status']} — {val}"
-            + (f" ({item['location']})" if item.get('location') else "")
-        )
-    return f"{len(items)} item(s):\n" + "\n".join(lines)
+    return format_inventory(estate_id, items)
 
 
 @tool("Get Fairness Summary")
 def fairness_tool(estate_id: int) -> str:
     """Get distribution balance across family members."""
-    summary = get_fairness_summary(estate_id)
-    if not summary:
-        return "No distributions recorded yet."
-    lines = [
-        f"- {row['member_name']}: {row['item_count']} item(s), ~${float(row['total_value']):.0f} total"
-        for row in summary
-    ]
-    return "Distribution summary:\n" + "\n".join(lines)
+    return format_fairness(get_fairness_summary(estate_id))
 
 
 @tool("Get Conflicts")
 def get_conflicts_tool(estate_id: int) -> str:
     """Find all items with more than one pending claim."""
-    from db.database import get_connection, USE_POSTGRES
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT i.id, i.name, COUNT(cl.id) as claim_count
-        FROM inventory_items i
-        JOIN claims cl ON cl.item_id = i.id
-        WHERE i.estate_id={p} AND cl.status='pending' AND i.status != 'distributed'
-        GROUP BY i.id, i.name
-        HAVING COUNT(cl.id) > 1
-        ORDER BY claim_count DESC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if not rows:
-        return "No conflicts found."
-    lines = [f"- Item [{row[0]}] '{row[1]}': {row[2]} claimants" for row in rows]
-    return f"⚠️ {len(rows)} conflict(s):\n" + "\n".join(lines)
+    return format_conflicts(get_conflicts(estate_id))
 
 
 # ── Runners ───────────────────────────────────────────────────────────────────
 
-def run_add_inventory(estate_id: int, items: list) -> str:
-    """Morris calls this to bulk-add items. Each addition is audited."""
-    llm = make_llm()
-    agent = Agent(
-        role="Tabulator — FM Ledger",
-        goal="Add all items to the estate inventory. Write an audit entry for each.",
-        backstory=TABULATOR_CHARACTER,
-        tools=[add_item_tool],
-        llm=llm,
-        verbose=True
-    )
-    items_text = "\n".join([
-        f"- {item['name']}: {item.get('description','')} | "
-        f"Location: {item.get('location','unknown')} | "
-        f"Category: {item.get('category','general')} | "
-        f"Est. value: ${item.get('estimated_value',0)}"
-        for item in items
-    ])
-    task = Task(
-        description=(
-            f"Add these items to estate ID {estate_id}:\n\n{items_text}\n\n"
-            "Use Add Inventory Item for each. An audit entry is written automatically."
-        ),
-        expected_output="All items added with audit entries.",
-        agent=agent
-    )
-    result = Crew(agents=[agent], tasks=[task], verbose=True).kickoff()
-    return str(result)
+def run_add_inventory(estate_id: int, items: list, added_by: str = "Morris") -> str:
+    """
+    Morris calls this to bulk-add items. Each addition is audited.
+    All items and their audit entries go in as one transaction — no agent
+    round trip per item.
+    """
+    with connection() as conn:
+        item_ids = add_items_bulk(estate_id, items, conn=conn)
+        write_audit_many([
+            dict(
+                estate_id=estate_id,
+                item_id=item_id,
+                actor_name=added_by,
+                action_type='item_added',
+                public_summary=f"{added_by} added \"{item['name']}\" to the inventory.",
+                metadata={
+                    "category": item.get('category'),
+                    "location": item.get('location'),
+                    "estimated_value": item.get('estimated_value') or 0,
+                },
+            )
+            for item_id, item in zip(item_ids, items)
+        ], conn=conn)
+    return "\n".join(
+        f"Item '{item['name']}' added. Item ID: {item_id}."
+        for item_id, item in zip(item_ids, items)
+    ) + f"\n{len(item_ids)} audit entries written."
 
 
 def run_status_report(estate_id: int) -> str:
     """Full estate status: inventory, conflicts, fairness, recent activity."""
+    # Prefetch the ledger in one concurrent pass rather than having the
+    # agent call each lookup tool in turn.
+    bundle = get_status_bundle(estate_id)
+    ledger_text = (
+        f"Inventory:\n{format_inventory(estate_id, bundle['inventory'])}\n\n"
+        f"Conflicts:\n{format_conflicts(bundle['conflicts'])}\n\n"
+        f"{format_fairness(bundle['fairness'])}"
+    )
+
     llm = make_llm()
     agent = Agent(
         role="Tabulator — FM Ledger",
         goal="Generate a complete, clear status report for this estate.",
         backstory=TABULATOR_CHARACTER,
-        tools=[get_inventory_tool, get_conflicts_tool, fairness_tool, get_estate_activity_tool],
+        tools=[get_estate_activity_tool],
         llm=llm,
         verbose=True
     )
     task = Task(
         description=(
             f"Generate a full status report for estate ID {estate_id}.\n\n"
+            f"Current ledger:\n{ledger_text}\n\n"
             "Include: inventory summary, active conflicts, fairness summary, "
             "and the 10 most recent audit entries. Be precise and factual."
         ),
@@ -6,8 +6,19 @@ Falls back to SQLite for local development if DATABASE_URL is not set.
 """
 
 import os
+import re
+import io
 import json
-from datetime import datetime
+import atexit
+import queue
+import secrets
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,46 +26,346 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 USE_POSTGRES = DATABASE_URL is not None
 
+# Dialect fragments, fixed at import so the SQL below is built once.
+_P = '%s' if USE_POSTGRES else '?'
+_TRUE = 'TRUE' if USE_POSTGRES else '1'
+_FALSE = 'FALSE' if USE_POSTGRES else '0'
+_RETURNING_ID = ' RETURNING id' if USE_POSTGRES else ''
+# Local time as ISO text, the same clock as datetime.now().isoformat() on the
+# app side: SQLite's 'localtime' is the process zone, and Postgres sessions
+# are pinned to that zone (see _local_zone) so LOCALTIMESTAMP agrees with it.
+_NOW = (
+    "to_char(LOCALTIMESTAMP, 'YYYY-MM-DD\"T\"HH24:MI:SS.US')" if USE_POSTGRES
+    else "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+)
+
+
+
+def _local_zone() -> str:
+    """
+    This process's local time zone as a Postgres TimeZone value: TZ or the
+    /etc/localtime zoneinfo name, else the current fixed UTC offset.
+    """
+    tz = os.getenv("TZ", "").lstrip(":")
+    if tz:
+        return tz
+    path = os.path.realpath("/etc/localtime")
+    if "zoneinfo/" in path:
+        return path.split("zoneinfo/", 1)[1]
+    # POSIX offsets count hours west of UTC, the opposite sign of ISO
+    offset = -(time.altzone if time.localtime().tm_isdst > 0 else time.timezone)
+    hours, minutes = divmod(abs(offset) // 60, 60)
+    return f"<LOCAL>{'-' if offset >= 0 else '+'}{hours:02d}:{minutes:02d}"
+
+
 if USE_POSTGRES:
     import psycopg2
     import psycopg2.extras
+    import psycopg2.pool
+    IntegrityError = psycopg2.IntegrityError
+    # Connection-level failures worth retrying, as opposed to rejected data
+    TRANSIENT_ERRORS = (
+        psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.pool.PoolError
+    )
+    # Every session runs in the app's zone, so SQL-stamped _NOW values
+    # compare correctly with datetime.now() on the Python side
+    _PG_OPTIONS = f"-c timezone={_local_zone()}"
     print("Using PostgreSQL")
 else:
     import sqlite3
+    IntegrityError = sqlite3.IntegrityError
+    TRANSIENT_ERRORS = (sqlite3.OperationalError, sqlite3.InterfaceError)
     print("Using SQLite (local dev)")
 
 
 # ── Connection ────────────────────────────────────────────────────────────────
 
+_wal_enabled = False
+_pool_lock = threading.Lock()
+
+
 def get_connection():
+    """Open a standalone connection. Helpers borrow one via connection()."""
     if USE_POSTGRES:
-        conn = psycopg2.connect(DATABASE_URL)
+        conn = psycopg2.connect(
+            DATABASE_URL, options=_PG_OPTIONS,
+            cursor_factory=psycopg2.extras.RealDictCursor
+        )
         conn.autocommit = False
         return conn
     else:
+        global _wal_enabled
         DB_PATH = os.path.join(os.path.dirname(__file__), "fm_agent.db")
-        conn = __import__('sqlite3').connect(DB_PATH)
+        conn = __import__('sqlite3').connect(DB_PATH, check_same_thread=False)
         conn.row_factory = __import__('sqlite3').Row
+        # journal_mode is stored in the file, so set it once per process;
+        # the rest are per-connection and must run on every open.
+        if not _wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _wal_enabled = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        # Map up to 256 MB of the file so reads skip a syscall + copy per page.
+        conn.execute("PRAGMA mmap_size=268435456")
         return conn
 
 
-def fetchone_as_dict(cursor, row):
-    """Convert a postgres row to a dict."""
+_tls = threading.local()
+
+
+def _thread_connection():
+    """
+    One long-lived SQLite connection per thread, opened on first use.
+    It is dropped with the thread's locals when a worker thread exits.
+    """
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = _tls.conn = get_connection()
+    return conn
+
+
+@atexit.register
+def _close_thread_connection():
+    conn = getattr(_tls, "conn", None)
+    if conn is not None:
+        conn.close()
+        _tls.conn = None
+
+
+if USE_POSTGRES:
+    class _PreparingConnection(psycopg2.extensions.connection):
+        """
+        Pooled connection that remembers which statements it has prepared,
+        and when it was last handed back.
+        """
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
+            self.last_used = time.monotonic()
+
+
+# At most POOL_MAX connections; a borrower waits up to POOL_WAIT_SECONDS for
+# a free one rather than failing with PoolError. A connection idle longer
+# than POOL_VALIDATE_AFTER is pinged on checkout and replaced if the server
+# or a proxy dropped it; TCP keepalives make such drops rarer.
+POOL_MAX = 10
+POOL_WAIT_SECONDS = 30
+POOL_VALIDATE_AFTER = 30
+_pool = None
+_pool_slots = threading.BoundedSemaphore(POOL_MAX)
+
+
+def _get_pool():
+    """Build the shared Postgres pool on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=1, maxconn=POOL_MAX, dsn=DATABASE_URL, options=_PG_OPTIONS,
+                    keepalives=1, keepalives_idle=30, keepalives_interval=10,
+                    keepalives_count=3,
+                    connection_factory=_PreparingConnection,
+                    cursor_factory=psycopg2.extras.RealDictCursor
+                )
+    return _pool
+
+
+def _checkout(pool):
+    """A live connection from the pool; closed or dropped ones are replaced."""
+    conn = pool.getconn()
+    if conn.closed or time.monotonic() - conn.last_used > POOL_VALIDATE_AFTER:
+        try:
+            if conn.closed:
+                raise psycopg2.InterfaceError("connection already closed")
+            with conn.cursor() as c:
+                c.execute("SELECT 1")
+            conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+    return conn
+
+
+@contextmanager
+def connection():
+    """
+    Borrow a connection for one unit of work.
+    Commits on success, rolls back on error. On Postgres the connection
+    comes from a shared pool instead of a fresh TCP+TLS handshake per call;
+    on SQLite each thread reuses its own connection. Every borrow is its own
+    unit of work: a nested borrow on the same SQLite thread gets a separate
+    connection rather than joining the outer one. To share a transaction,
+    pass the open conn to helpers that take conn=.
+    """
+    nested = False
+    if USE_POSTGRES:
+        pool = _get_pool()
+        if not _pool_slots.acquire(timeout=POOL_WAIT_SECONDS):
+            raise psycopg2.pool.PoolError(
+                f"No database connection free after {POOL_WAIT_SECONDS}s."
+            )
+        try:
+            conn = _checkout(pool)
+        except BaseException:
+            _pool_slots.release()
+            raise
+    elif getattr(_tls, "busy", False):
+        conn = get_connection()
+        nested = True
+    else:
+        conn = _thread_connection()
+        _tls.busy = True
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        if not getattr(conn, "closed", False):
+            conn.rollback()
+        raise
+    finally:
+        if USE_POSTGRES:
+            conn.last_used = time.monotonic()
+            pool.putconn(conn, close=bool(conn.closed))
+            _pool_slots.release()
+        elif nested:
+            conn.close()
+        else:
+            _tls.busy = False
+
+
+def begin(conn):
+    """
+    Open an explicit transaction so a run of statements commits once.
+    psycopg2 already does this implicitly; sqlite3 autocommits DDL
+    unless a transaction is open, costing an fsync per statement.
+    """
+    if not USE_POSTGRES and not conn.in_transaction:
+        conn.execute("BEGIN")
+
+
+# Rows are read by column name on both dialects: Postgres connections use
+# RealDictCursor, SQLite connections use sqlite3.Row.
+
+def as_dicts(rows) -> list:
+    """
+    Plain dicts from fetchall() on either dialect. RealDictRow already is
+    one; sqlite3.Row is converted because callers use dict methods.
+    """
+    if USE_POSTGRES:
+        return rows
+    return [dict(r) for r in rows]
+
+
+def as_dict(row) -> dict:
+    """as_dicts() for a single fetchone() row; {} when there is none."""
     if row is None:
-        return None
-    cols = [desc[0] for desc in cursor.description]
-    return dict(zip(cols, row))
+        return {}
+    return row if USE_POSTGRES else dict(row)
+
+
+def inserted_id(c) -> int:
+    """Id of the row just written by an INSERT ending in _RETURNING_ID."""
+    if USE_POSTGRES:
+        return c.fetchone()['id']
+    return c.lastrowid
+
+
+# ── Prepared statements ───────────────────────────────────────────────────────
+# Hot single-row statements, prepared once per pooled Postgres connection so
+# repeat calls skip parse and plan. Written with $n placeholders; SQLite gets
+# the same text with ?, which its per-connection statement cache reuses.
+
+STATEMENTS = {
+    "get_state": "SELECT * FROM conversation_state WHERE id = 1",
+    "set_state": (
+        "UPDATE conversation_state SET state=$1, last_message=$2, "
+        f"search_results=$3, updated_at={_NOW} WHERE id=1"
+    ),
+    "mark_reminder_sent": "UPDATE saved_events SET reminder_sent=1 WHERE id=$1",
+    "write_audit": (
+        "INSERT INTO audit_log (estate_id, item_id, action_type, actor_id, "
+        "actor_name, public_summary, metadata, created_at) "
+        f"VALUES ($1,$2,$3,$4,$5,$6,$7,{_NOW})"
+    ),
+}
+
+_SQLITE_STATEMENTS = {
+    name: re.sub(r"\$\d+", "?", sql) for name, sql in STATEMENTS.items()
+}
+
+
+def execute_prepared(c, name: str, params: tuple = ()):
+    """Run a registered statement, preparing it on this connection first if needed."""
+    if not USE_POSTGRES:
+        c.execute(_SQLITE_STATEMENTS[name], params)
+        return
+    conn = c.connection
+    if name not in conn.prepared:
+        c.execute(f"PREPARE {name} AS {STATEMENTS[name]}")
+        conn.prepared.add(name)
+    if params:
+        c.execute(f"EXECUTE {name} ({','.join(['%s'] * len(params))})", params)
+    else:
+        c.execute(f"EXECUTE {name}")
+
+
+# ── Read cache ────────────────────────────────────────────────────────────────
+# Short-lived cache for read-mostly lookups. Writers in this module drop the
+# affected keys after commit; the TTL bounds staleness for writes made
+# elsewhere (e.g. the web app marking a member joined).
+
+CACHE_TTL_SECONDS = 5.0
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def cache_get(key):
+    """Cached value for key, or None if missing or expired."""
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is None:
+            return None
+        expires, value = hit
+        if expires < time.monotonic():
+            del _cache[key]
+            return None
+        return value
+
+
+def cache_put(key, value):
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, value)
 
 
-def fetchall_as_dict(cursor, rows):
-    cols = [desc[0] for desc in cursor.description]
-    return [dict(zip(cols, row)) for row in rows]
+def cache_drop(*keys, kind: str = None):
+    """Drop the given keys, and every (kind, ...) tuple key if kind is set."""
+    with _cache_lock:
+        for key in keys:
+            _cache.pop(key, None)
+        if kind:
+            for key in [k for k in _cache if isinstance(k, tuple) and k[0] == kind]:
+                del _cache[key]
 
 
 # ── Init ──────────────────────────────────────────────────────────────────────
 
-def init_db():
-    conn = get_connection()
+SQL_NONCANONICAL_START_TIMES = """
+    SELECT id, event_start_time FROM saved_events
+    WHERE reminder_sent = 0 AND event_start_time NOT LIKE '____-__-__T__:__:__'
+"""
+
+
+def init_db(conn=None):
+    """
+    Create the core tables.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_db(conn)
+    begin(conn)
     c = conn.cursor()
 
     if USE_POSTGRES:
@@ -86,12 +397,9 @@ def init_db():
                 created_at TEXT
             )
         """)
-        c.execute("SELECT COUNT(*) FROM conversation_state")
-        if c.fetchone()[0] == 0:
-            c.execute(
-                "INSERT INTO conversation_state (state, updated_at) VALUES ('idle', %s)",
-                (datetime.now().isoformat(),)
-            )
+        c.execute("SELECT COUNT(*) AS n FROM conversation_state")
+        if c.fetchone()['n'] == 0:
+            c.execute(f"INSERT INTO conversation_state (state, updated_at) VALUES ('idle', {_NOW})")
     else:
         c.execute("""
             CREATE TABLE IF NOT EXISTS conversation_state (
@@ -121,157 +429,187 @@ def init_db():
                 created_at TEXT
             )
         """)
-        c.execute("SELECT COUNT(*) FROM conversation_state")
-        if c.fetchone()[0] == 0:
-            c.execute(
-                "INSERT INTO conversation_state (state, updated_at) VALUES ('idle', ?)",
-                (datetime.now().isoformat(),)
-            )
-
-    conn.commit()
-    conn.close()
+        c.execute("SELECT COUNT(*) AS n FROM conversation_state")
+        if c.fetchone()['n'] == 0:
+            c.execute(f"INSERT INTO conversation_state (state, updated_at) VALUES ('idle', {_NOW})")
+
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_events_reminder_time
+        ON saved_events(reminder_sent, event_start_time)
+    """)
+    # Rows saved before start times were normalized would be mis-compared
+    # by the reminder window; rewrite any non-canonical ones still pending.
+    c.execute(SQL_NONCANONICAL_START_TIMES)
+    fixes = []
+    for r in c.fetchall():
+        fixed = _normalize_start_time(r['event_start_time'])
+        if fixed != r['event_start_time']:
+            fixes.append((fixed, r['id']))
+    if fixes:
+        c.executemany(f"UPDATE saved_events SET event_start_time={_P} WHERE id={_P}", fixes)
+    # Newest-first reads, with or without a type filter
+    c.execute("CREATE INDEX IF NOT EXISTS idx_mem_created ON memories(created_at)")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mem_type_created
+        ON memories(event_type, created_at)
+    """)
     print("Database initialized.")
 
 
 # ── State ─────────────────────────────────────────────────────────────────────
 
 def get_state():
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM conversation_state WHERE id = 1")
-    row = c.fetchone()
-    conn.close()
-    if row is None:
-        return {}
-    if USE_POSTGRES:
-        return fetchone_as_dict(c, row)
-    return dict(row)
+    cached = cache_get('state')
+    if cached is None:
+        with connection() as conn:
+            c = conn.cursor()
+            execute_prepared(c, "get_state")
+            row = c.fetchone()
+        cached = dict(row) if row is not None else {}
+        cache_put('state', cached)
+    return dict(cached)
 
 
 def set_state(state: str, last_message: str = None, search_results: str = None):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute(
-            "UPDATE conversation_state SET state=%s, last_message=%s, search_results=%s, updated_at=%s WHERE id=1",
-            (state, last_message, search_results, now)
-        )
-    else:
-        c.execute(
-            "UPDATE conversation_state SET state=?, last_message=?, search_results=?, updated_at=? WHERE id=1",
-            (state, last_message, search_results, now)
-        )
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        execute_prepared(c, "set_state", (state, last_message, search_results))
+    cache_drop('state')
 
 
 # ── Events ────────────────────────────────────────────────────────────────────
 
+SQL_INSERT_EVENTS = (
+    "INSERT INTO saved_events (event_name, event_location, event_start_time, created_at) "
+    + ("VALUES %s" if USE_POSTGRES else f"VALUES (?,?,?,{_NOW})")
+)
+VALUES_INSERT_EVENTS = f"(%s,%s,%s,{_NOW})"
+SQL_UNREMINDED_EVENTS = f"""
+    SELECT * FROM saved_events
+    WHERE reminder_sent = 0 AND event_start_time > {_P} AND event_start_time <= {_P}
+"""
+
+def _normalize_start_time(value):
+    """
+    Canonical local ISO text ('YYYY-MM-DDTHH:MM:SS') so the reminder window
+    can be compared as strings. Offsets are converted to local time;
+    unparseable values are stored as given.
+    """
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.isoformat()
+
+
+def save_events_bulk(events: list) -> int:
+    """
+    Insert many events in one transaction.
+    events: list of dicts with event_name, event_location, event_start_time.
+    """
+    if not events:
+        return 0
+    rows = [
+        (e['event_name'], e.get('event_location'),
+         _normalize_start_time(e.get('event_start_time')))
+        for e in events
+    ]
+    with connection() as conn:
+        c = conn.cursor()
+        if USE_POSTGRES:
+            psycopg2.extras.execute_values(
+                c, SQL_INSERT_EVENTS, rows, template=VALUES_INSERT_EVENTS
+            )
+        else:
+            c.executemany(SQL_INSERT_EVENTS, rows)
+    return len(rows)
+
+
 def save_event(event_name: str, event_location: str, event_start_time: str):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute(
-            "INSERT INTO saved_events (event_name, event_location, event_start_time, created_at) VALUES (%s,%s,%s,%s)",
-            (event_name, event_location, event_start_time, now)
-        )
-    else:
-        c.execute(
-            "INSERT INTO saved_events (event_name, event_location, event_start_time, created_at) VALUES (?,?,?,?)",
-            (event_name, event_location, event_start_time, now)
-        )
-    conn.commit()
-    conn.close()
+    save_events_bulk([{
+        'event_name': event_name,
+        'event_location': event_location,
+        'event_start_time': event_start_time,
+    }])
     print(f"Event saved: {event_name}")
 
 
 def get_unreminded_events():
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM saved_events WHERE reminder_sent = 0")
-    rows = c.fetchall()
-    conn.close()
-
-    if USE_POSTGRES:
-        rows = fetchall_as_dict(c, rows)
-    else:
-        rows = [dict(r) for r in rows]
-
-    upcoming = []
+    """
+    Events starting in the next 65 minutes that haven't been reminded.
+    event_start_time is stored as ISO text, so the window is compared as
+    strings and served by idx_events_reminder_time.
+    """
     now = datetime.now()
-    for row in rows:
-        try:
-            event_time = datetime.fromisoformat(row["event_start_time"])
-            minutes_until = (event_time - now).total_seconds() / 60
-            if 0 < minutes_until <= 65:
-                upcoming.append(row)
-        except Exception:
-            pass
-    return upcoming
+    window = (now.isoformat(), (now + timedelta(minutes=65)).isoformat())
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_UNREMINDED_EVENTS, window)
+        rows = c.fetchall()
+    return as_dicts(rows)
 
 
 def mark_reminder_sent(event_id: int):
-    conn = get_connection()
-    c = conn.cursor()
-    if USE_POSTGRES:
-        c.execute("UPDATE saved_events SET reminder_sent=1 WHERE id=%s", (event_id,))
-    else:
-        c.execute("UPDATE saved_events SET reminder_sent=1 WHERE id=?", (event_id,))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        execute_prepared(c, "mark_reminder_sent", (event_id,))
 
 
 # ── Memories ──────────────────────────────────────────────────────────────────
 
-def write_memory_to_db(event_type: str, summary: str, metadata: dict = None):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    meta = json.dumps(metadata or {})
-    if USE_POSTGRES:
-        c.execute(
-            "INSERT INTO memories (event_type, summary, metadata, created_at) VALUES (%s,%s,%s,%s)",
-            (event_type, summary, meta, now)
-        )
-    else:
-        c.execute(
-            "INSERT INTO memories (event_type, summary, metadata, created_at) VALUES (?,?,?,?)",
-            (event_type, summary, meta, now)
-        )
-    conn.commit()
-    conn.close()
-
+SQL_INSERT_MEMORY = (
+    "INSERT INTO memories (event_type, summary, metadata, created_at) "
+    f"VALUES ({_P},{_P},{_P},{_NOW})"
+)
+# The type filter is a single array/JSON parameter (NULL for "all"), so the
+# statement text is the same for every call and stays cacheable.
+_MEMORY_FILTER = (
+    ("WHERE (%s::text[] IS NULL OR event_type = ANY(%s)) " if USE_POSTGRES
+     else "WHERE (? IS NULL OR event_type IN (SELECT value FROM json_each(?))) ")
+    + f"ORDER BY created_at DESC, id DESC LIMIT {_P}"
+)
+# Agent-context lines built in SQL, keyed by whether the type is shown
+SQL_MEMORY_LINES = {
+    True: "SELECT '[' || substr(created_at, 1, 10) || '] ' || upper(event_type) "
+          "|| ': ' || summary AS line FROM memories " + _MEMORY_FILTER,
+    False: "SELECT '[' || substr(created_at, 1, 10) || '] ' || summary AS line "
+           "FROM memories " + _MEMORY_FILTER,
+}
 
-def read_memories(limit: int = 10, types: list = None) -> list:
-    conn = get_connection()
-    c = conn.cursor()
-    if types:
-        placeholders = ','.join(['%s' if USE_POSTGRES else '?' for _ in types])
-        query = f"SELECT event_type, summary, created_at FROM memories WHERE event_type IN ({placeholders}) ORDER BY created_at DESC LIMIT {'%s' if USE_POSTGRES else '?'}"
-        c.execute(query, types + [limit])
-    else:
-        param = '%s' if USE_POSTGRES else '?'
-        c.execute(f"SELECT event_type, summary, created_at FROM memories ORDER BY created_at DESC LIMIT {param}", (limit,))
+def write_memory_to_db(event_type: str, summary: str, metadata: dict = None):
+    with connection() as conn:
+        c = conn.cursor()
+        meta = json.dumps(metadata) if metadata else None
+        c.execute(SQL_INSERT_MEMORY, (event_type, summary, meta))
+    cache_drop(kind='memories')
 
-    rows = c.fetchall()
-    conn.close()
 
-    if USE_POSTGRES:
-        return fetchall_as_dict(c, rows)
-    return [dict(r) for r in rows]
+def read_memory_lines(limit: int = 10, types: list = None, show_type: bool = True) -> list:
+    """Newest-first memories as "[date] TYPE: summary" strings."""
+    if not types:
+        types = None
+    elif not USE_POSTGRES:
+        types = json.dumps(list(types))
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_MEMORY_LINES[show_type], (types, types, limit))
+        return [row['line'] for row in c.fetchall()]
 
 
 # ── Family Members ────────────────────────────────────────────────────────────
 
 def init_family_tables(conn=None):
-    """Add family member and estate tables. Call after init_db()."""
-    close = conn is None
+    """
+    Add family member and estate tables. Call after init_db().
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
     if conn is None:
-        conn = get_connection()
+        with connection() as conn:
+            return init_family_tables(conn)
+    begin(conn)
     c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
 
     if USE_POSTGRES:
         c.execute("""
@@ -324,102 +662,139 @@ def init_family_tables(conn=None):
             )
         """)
 
-    conn.commit()
-    if close:
-        conn.close()
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_family_estate_status
+        ON family_members(estate_id, status)
+    """)
+
+
+SQL_CREATE_ESTATE = (
+    "INSERT INTO estates (deceased_name, executor_name, executor_email, created_at) "
+    f"VALUES ({_P},{_P},{_P},{_NOW})" + _RETURNING_ID
+)
+# A join_code collision skips the row instead of failing the batch.
+SQL_ADD_FAMILY_MEMBERS = (
+    "INSERT INTO family_members (estate_id, name, email, role, join_code, invited_at) "
+    + ("VALUES %s ON CONFLICT (join_code) DO NOTHING RETURNING join_code" if USE_POSTGRES
+       else f"VALUES (?,?,?,?,?,{_NOW}) ON CONFLICT (join_code) DO NOTHING")
+)
+VALUES_ADD_FAMILY_MEMBERS = f"(%s,%s,%s,%s,%s,{_NOW})"
+SQL_PENDING_MEMBERS = f"SELECT * FROM family_members WHERE estate_id={_P} AND status='invited'"
+SQL_ALL_MEMBERS = f"SELECT * FROM family_members WHERE estate_id={_P}"
+SQL_MARK_MEMBER_JOINED = f"UPDATE family_members SET status='joined', joined_at={_NOW} WHERE join_code={_P}"
 
 
 def create_estate(deceased_name: str, executor_name: str, executor_email: str) -> int:
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute(
-            "INSERT INTO estates (deceased_name, executor_name, executor_email, created_at) VALUES (%s,%s,%s,%s) RETURNING id",
-            (deceased_name, executor_name, executor_email, now)
-        )
-        estate_id = c.fetchone()[0]
-    else:
-        c.execute(
-            "INSERT INTO estates (deceased_name, executor_name, executor_email, created_at) VALUES (?,?,?,?)",
-            (deceased_name, executor_name, executor_email, now)
-        )
-        estate_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_CREATE_ESTATE, (deceased_name, executor_name, executor_email))
+        estate_id = inserted_id(c)
     return estate_id
 
 
+JOIN_CODE_ALPHABET = string.ascii_uppercase + string.digits
+JOIN_CODE_LENGTH = 6
+JOIN_CODE_ATTEMPTS = 5
+
+
+def new_join_code() -> str:
+    """A join code short enough to type from an invite email."""
+    return ''.join(secrets.choice(JOIN_CODE_ALPHABET) for _ in range(JOIN_CODE_LENGTH))
+
+
+def add_family_members_bulk(estate_id: int, members: list) -> list:
+    """
+    Add several family members in one transaction.
+    members: list of dicts with name, email and optional role.
+    Returns their join codes in input order. join_code is UNIQUE, so rows
+    whose code collided are retried with fresh codes.
+    """
+    if not members:
+        return []
+    codes = [None] * len(members)
+    todo = list(range(len(members)))
+    with connection() as conn:
+        c = conn.cursor()
+        for _ in range(JOIN_CODE_ATTEMPTS):
+            tries = {new_join_code(): i for i in todo}
+            rows = [
+                (estate_id, members[i]['name'], members[i]['email'],
+                 members[i].get('role') or 'member', code)
+                for code, i in tries.items()
+            ]
+            if USE_POSTGRES:
+                inserted = psycopg2.extras.execute_values(
+                    c, SQL_ADD_FAMILY_MEMBERS, rows,
+                    template=VALUES_ADD_FAMILY_MEMBERS, page_size=len(rows), fetch=True
+                )
+                inserted = {r['join_code'] for r in inserted}
+            else:
+                inserted = set()
+                for row in rows:
+                    c.execute(SQL_ADD_FAMILY_MEMBERS, row)
+                    if c.rowcount:
+                        inserted.add(row[4])
+            for code in inserted:
+                codes[tries[code]] = code
+            # Codes drawn twice in one round collapse to one key; those rows retry too
+            todo = [i for i in todo if codes[i] is None]
+            if not todo:
+                break
+        else:
+            raise IntegrityError("Could not generate unique join codes.")
+    cache_drop(('members', estate_id))
+    return codes
+
+
 def add_family_member(estate_id: int, name: str, email: str, role: str = "member") -> str:
     """Add a family member and generate their unique join code."""
-    import random
-    import string
-    join_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    now = datetime.now().isoformat()
-    conn = get_connection()
-    c = conn.cursor()
-    if USE_POSTGRES:
-        c.execute(
-            "INSERT INTO family_members (estate_id, name, email, role, join_code, invited_at) VALUES (%s,%s,%s,%s,%s,%s)",
-            (estate_id, name, email, role, join_code, now)
-        )
-    else:
-        c.execute(
-            "INSERT INTO family_members (estate_id, name, email, role, join_code, invited_at) VALUES (?,?,?,?,?,?)",
-            (estate_id, name, email, role, join_code, now)
-        )
-    conn.commit()
-    conn.close()
-    return join_code
+    return add_family_members_bulk(estate_id, [
+        {'name': name, 'email': email, 'role': role}
+    ])[0]
 
 
 def get_pending_members(estate_id: int) -> list:
     """Get family members who haven't joined yet."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"SELECT * FROM family_members WHERE estate_id={p} AND status='invited'", (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [desc[0] for desc in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_PENDING_MEMBERS, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
 
 
 def get_all_members(estate_id: int) -> list:
     """Get all family members for an estate."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"SELECT * FROM family_members WHERE estate_id={p}", (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [desc[0] for desc in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    key = ('members', estate_id)
+    members = cache_get(key)
+    if members is None:
+        with connection() as conn:
+            c = conn.cursor()
+            c.execute(SQL_ALL_MEMBERS, (estate_id,))
+            members = as_dicts(c.fetchall())
+        cache_put(key, members)
+    return [dict(m) for m in members]
 
 
 def mark_member_joined(join_code: str):
     """Mark a family member as having joined."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(
-        f"UPDATE family_members SET status='joined', joined_at={p} WHERE join_code={p}",
-        (now, join_code)
-    )
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_MARK_MEMBER_JOINED, (join_code,))
+    # The estate isn't known from the code alone
+    cache_drop(kind='members')
 
 
 # ── Tabulator Tables ──────────────────────────────────────────────────────────
 
-def init_tabulator_tables():
-    """Add inventory and claims tables."""
-    conn = get_connection()
+def init_tabulator_tables(conn=None):
+    """
+    Add inventory and claims tables.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_tabulator_tables(conn)
+    begin(conn)
     c = conn.cursor()
 
     if USE_POSTGRES:
@@ -513,154 +888,341 @@ def init_tabulator_tables():
             )
         """)
 
-    conn.commit()
-    conn.close()
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_inventory_estate_status_id
+        ON inventory_items(estate_id, status, id)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_claims_item_status
+        ON claims(item_id, status)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_distributions_estate_member
+        ON distributions(estate_id, member_name)
+    """)
+
+
+SQL_INSERT_ITEMS = (
+    "INSERT INTO inventory_items "
+    "(estate_id, name, description, location, category, estimated_value, created_at, updated_at) "
+    + ("VALUES %s RETURNING id" if USE_POSTGRES else f"VALUES (?,?,?,?,?,?,{_NOW},{_NOW})")
+)
+VALUES_INSERT_ITEMS = f"(%s,%s,%s,%s,%s,%s,{_NOW},{_NOW})"
+SQL_ITEMS_STAGE = """
+    CREATE TEMP TABLE items_in (
+        seq INTEGER, name TEXT, description TEXT, location TEXT,
+        category TEXT, estimated_value NUMERIC
+    ) ON COMMIT DROP
+"""
+SQL_ITEMS_COPY = (
+    "COPY items_in (seq, name, description, location, category, estimated_value) "
+    "FROM STDIN"
+)
+SQL_ITEMS_FROM_STAGE = f"""
+    INSERT INTO inventory_items
+    (estate_id, name, description, location, category, estimated_value, created_at, updated_at)
+    SELECT %s, name, description, location, category, estimated_value, {_NOW}, {_NOW}
+    FROM items_in ORDER BY seq
+    RETURNING id
+"""
+SQL_INSERT_CLAIMS = (
+    "INSERT INTO claims "
+    "(item_id, estate_id, member_id, member_name, claim_type, priority, note, created_at) "
+    + ("VALUES %s RETURNING id" if USE_POSTGRES else f"VALUES (?,?,?,?,?,?,?,{_NOW})")
+)
+VALUES_INSERT_CLAIMS = f"(%s,%s,%s,%s,%s,%s,%s,{_NOW})"
+SQL_ITEM_CLAIMS = f"SELECT * FROM claims WHERE item_id={_P} AND status='pending'"
+SQL_ESTATE_INVENTORY = f"SELECT * FROM inventory_items WHERE estate_id={_P} ORDER BY id"
+SQL_ESTATE_INVENTORY_BY_STATUS = (
+    f"SELECT * FROM inventory_items WHERE estate_id={_P} AND status={_P} ORDER BY id"
+)
+# Keyset page for iter_estate_inventory: the next rows after the last id seen
+SQL_INVENTORY_PAGE = (
+    f"SELECT * FROM inventory_items WHERE estate_id={_P} AND id>{_P} "
+    f"AND ({_P} IS NULL OR status={_P}) ORDER BY id LIMIT {_P}"
+)
+SQL_RESOLVE_CLAIM = f"""
+    WITH upd AS (
+        UPDATE inventory_items SET status='distributed', updated_at={_NOW}
+        WHERE id=%s RETURNING estate_id
+    ), ucl AS (
+        UPDATE claims SET status='resolved', resolved_at={_NOW} WHERE item_id=%s
+    )
+    INSERT INTO distributions
+    (item_id, estate_id, member_id, member_name, estimated_value, distribution_method, distributed_at)
+    SELECT %s, estate_id, %s, %s, %s, %s, {_NOW} FROM upd
+    RETURNING estate_id
+"""
+SQL_DISTRIBUTE_ITEM = f"UPDATE inventory_items SET status='distributed', updated_at={_NOW} WHERE id=?"
+SQL_RESOLVE_ITEM_CLAIMS = f"UPDATE claims SET status='resolved', resolved_at={_NOW} WHERE item_id=?"
+SQL_ITEM_ESTATE = "SELECT estate_id FROM inventory_items WHERE id=?"
+SQL_INSERT_DISTRIBUTION = f"""
+    INSERT INTO distributions
+    (item_id, estate_id, member_id, member_name, estimated_value, distribution_method, distributed_at)
+    VALUES (?,?,?,?,?,?,{_NOW})
+"""
+SQL_FAIRNESS_SUMMARY = f"""
+    SELECT member_name,
+           COUNT(*) as item_count,
+           COALESCE(SUM(estimated_value), 0) as total_value
+    FROM distributions
+    WHERE estate_id={_P}
+    GROUP BY member_name
+    ORDER BY total_value DESC
+"""
+SQL_CONFLICTS = f"""
+    SELECT i.id, i.name, COUNT(cl.id) as claim_count
+    FROM inventory_items i
+    JOIN claims cl ON cl.item_id = i.id
+    WHERE i.estate_id={_P} AND cl.status='pending' AND i.status != 'distributed'
+    GROUP BY i.id, i.name
+    HAVING COUNT(cl.id) > 1
+    ORDER BY claim_count DESC
+"""
 
 
-def add_item(estate_id: int, name: str, description: str = None,
-             location: str = None, category: str = None,
-             estimated_value: float = 0) -> int:
-    conn = get_connection()
+def add_items_bulk(estate_id: int, items: list, conn=None) -> list:
+    """
+    Insert many inventory items in one transaction.
+    items: list of dicts with name and optional description, location,
+    category, estimated_value. Returns the new ids in input order.
+    Pass conn to insert inside a caller's transaction; the caller commits.
+    """
+    if not items:
+        return []
+    if conn is None:
+        with connection() as conn:
+            return add_items_bulk(estate_id, items, conn)
+    rows = [
+        (estate_id, i['name'], i.get('description'), i.get('location'),
+         i.get('category'), i.get('estimated_value') or 0)
+        for i in items
+    ]
     c = conn.cursor()
-    now = datetime.now().isoformat()
     if USE_POSTGRES:
-        c.execute("""
-            INSERT INTO inventory_items
-            (estate_id, name, description, location, category, estimated_value, created_at, updated_at)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id
-        """, (estate_id, name, description, location, category, estimated_value, now, now))
-        item_id = c.fetchone()[0]
-    else:
-        c.execute("""
-            INSERT INTO inventory_items
-            (estate_id, name, description, location, category, estimated_value, created_at, updated_at)
-            VALUES (?,?,?,?,?,?,?,?)
-        """, (estate_id, name, description, location, category, estimated_value, now, now))
-        item_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return item_id
+        ids = psycopg2.extras.execute_values(
+            c, SQL_INSERT_ITEMS, rows, template=VALUES_INSERT_ITEMS,
+            page_size=len(rows), fetch=True
+        )
+        return [r['id'] for r in ids]
+    # sqlite3 executemany does not expose per-row ids; one transaction
+    # still means a single commit.
+    ids = []
+    for row in rows:
+        c.execute(SQL_INSERT_ITEMS, row)
+        ids.append(c.lastrowid)
+    return ids
+
+
+def _copy_field(value) -> str:
+    """Render one value for COPY's text format."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def add_items_copy(estate_id: int, items: list) -> list:
+    """
+    Bulk-load inventory items (e.g. a spreadsheet upload).
+    On Postgres the rows are streamed with COPY into a temp table and moved
+    across with one INSERT ... SELECT; SQLite falls back to add_items_bulk.
+    Returns the new ids in input order.
+    """
+    if not USE_POSTGRES or not items:
+        return add_items_bulk(estate_id, items)
+    buf = io.StringIO()
+    for seq, i in enumerate(items):
+        row = (seq, i['name'], i.get('description'), i.get('location'),
+               i.get('category'), i.get('estimated_value') or 0)
+        buf.write('\t'.join(map(_copy_field, row)) + '\n')
+    buf.seek(0)
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_ITEMS_STAGE)
+        c.copy_expert(SQL_ITEMS_COPY, buf)
+        c.execute(SQL_ITEMS_FROM_STAGE, (estate_id,))
+        return [r['id'] for r in c.fetchall()]
+
+
+def add_item(estate_id: int, name: str, description: str = None,
+             location: str = None, category: str = None,
+             estimated_value: float = 0, conn=None) -> int:
+    return add_items_bulk(estate_id, [{
+        'name': name,
+        'description': description,
+        'location': location,
+        'category': category,
+        'estimated_value': estimated_value,
+    }], conn)[0]
+
+
+def add_claims_bulk(estate_id: int, claims: list) -> list:
+    """
+    Insert many claims in one transaction.
+    claims: list of dicts with item_id, member_id, member_name and optional
+    claim_type, priority, note. Returns the new ids in input order.
+    """
+    if not claims:
+        return []
+    rows = [
+        (cl['item_id'], estate_id, cl['member_id'], cl['member_name'],
+         cl.get('claim_type') or 'want', cl.get('priority') or 1, cl.get('note'))
+        for cl in claims
+    ]
+    with connection() as conn:
+        c = conn.cursor()
+        if USE_POSTGRES:
+            ids = psycopg2.extras.execute_values(
+                c, SQL_INSERT_CLAIMS, rows, template=VALUES_INSERT_CLAIMS,
+                page_size=len(rows), fetch=True
+            )
+            return [r['id'] for r in ids]
+        ids = []
+        for row in rows:
+            c.execute(SQL_INSERT_CLAIMS, row)
+            ids.append(c.lastrowid)
+    return ids
 
 
 def add_claim(item_id: int, estate_id: int, member_id: int,
               member_name: str, claim_type: str = "want",
               priority: int = 1, note: str = None) -> int:
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute("""
-            INSERT INTO claims
-            (item_id, estate_id, member_id, member_name, claim_type, priority, note, created_at)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id
-        """, (item_id, estate_id, member_id, member_name, claim_type, priority, note, now))
-        claim_id = c.fetchone()[0]
-    else:
-        c.execute("""
-            INSERT INTO claims
-            (item_id, estate_id, member_id, member_name, claim_type, priority, note, created_at)
-            VALUES (?,?,?,?,?,?,?,?)
-        """, (item_id, estate_id, member_id, member_name, claim_type, priority, note, now))
-        claim_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return claim_id
+    return add_claims_bulk(estate_id, [{
+        'item_id': item_id,
+        'member_id': member_id,
+        'member_name': member_name,
+        'claim_type': claim_type,
+        'priority': priority,
+        'note': note,
+    }])[0]
 
 
 def get_item_claims(item_id: int) -> list:
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"SELECT * FROM claims WHERE item_id={p} AND status='pending'", (item_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [desc[0] for desc in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_ITEM_CLAIMS, (item_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
+
+
+def iter_estate_inventory(estate_id: int, status: str = None,
+                          page_size: int = 200) -> Iterator[dict]:
+    """
+    Yield an estate's inventory rows, fetched page_size at a time.
+    Each page is read and copied out on its own connection before its rows
+    are yielded, so no connection or transaction is held while the caller
+    works through them.
+    """
+    last_id = 0
+    while True:
+        with connection() as conn:
+            c = conn.cursor()
+            c.execute(SQL_INVENTORY_PAGE, (estate_id, last_id, status, status, page_size))
+            rows = as_dicts(c.fetchall())
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
 
 
 def get_estate_inventory(estate_id: int, status: str = None) -> list:
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    if status:
-        c.execute(f"SELECT * FROM inventory_items WHERE estate_id={p} AND status={p}", (estate_id, status))
-    else:
-        c.execute(f"SELECT * FROM inventory_items WHERE estate_id={p}", (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [desc[0] for desc in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        if status:
+            c.execute(SQL_ESTATE_INVENTORY_BY_STATUS, (estate_id, status))
+        else:
+            c.execute(SQL_ESTATE_INVENTORY, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
 
 
 def resolve_claim(item_id: int, winner_member_id: int,
                   winner_name: str, method: str, value: float = 0):
-    """Mark an item as distributed to a specific family member."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    p = '%s' if USE_POSTGRES else '?'
+    """
+    Mark an item as distributed to a specific family member.
+    The distribution is recorded under the item's own estate. Returns that
+    estate_id, or None if the item doesn't exist.
+    """
+    with connection() as conn:
+        c = conn.cursor()
 
-    # Update item status
-    c.execute(f"UPDATE inventory_items SET status='distributed', updated_at={p} WHERE id={p}", (now, item_id))
+        if USE_POSTGRES:
+            c.execute(SQL_RESOLVE_CLAIM, (item_id, item_id,
+                      item_id, winner_member_id, winner_name, value, method))
+            row = c.fetchone()
+            return row['estate_id'] if row else None
 
-    # Mark all claims resolved
-    c.execute(f"UPDATE claims SET status='resolved', resolved_at={p} WHERE item_id={p}", (now, item_id))
+        # Take the write lock up front so the four statements can't
+        # interleave with another writer.
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
 
-    # Get estate_id
-    c.execute(f"SELECT estate_id FROM inventory_items WHERE id={p}", (item_id,))
-    row = c.fetchone()
-    estate_id = row[0] if row else None
+        c.execute(SQL_ITEM_ESTATE, (item_id,))
+        row = c.fetchone()
+        if row is None:
+            return None
+        estate_id = row['estate_id']
 
-    # Record distribution
-    if estate_id:
-        if USE_POSTGRES:
-            c.execute("""
-                INSERT INTO distributions
-                (item_id, estate_id, member_id, member_name, estimated_value, distribution_method, distributed_at)
-                VALUES (%s,%s,%s,%s,%s,%s,%s)
-            """, (item_id, estate_id, winner_member_id, winner_name, value, method, now))
-        else:
-            c.execute("""
-                INSERT INTO distributions
-                (item_id, estate_id, member_id, member_name, estimated_value, distribution_method, distributed_at)
-                VALUES (?,?,?,?,?,?,?)
-            """, (item_id, estate_id, winner_member_id, winner_name, value, method, now))
+        # Update item status
+        c.execute(SQL_DISTRIBUTE_ITEM, (item_id,))
+
+        # Mark all claims resolved
+        c.execute(SQL_RESOLVE_ITEM_CLAIMS, (item_id,))
 
-    conn.commit()
-    conn.close()
+        # Record distribution
+        c.execute(SQL_INSERT_DISTRIBUTION, (item_id, estate_id, winner_member_id,
+                                            winner_name, value, method))
+        return estate_id
 
 
 def get_fairness_summary(estate_id: int) -> list:
     """Return total estimated value distributed per family member."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT member_name,
-               COUNT(*) as item_count,
-               COALESCE(SUM(estimated_value), 0) as total_value
-        FROM distributions
-        WHERE estate_id={p}
-        GROUP BY member_name
-        ORDER BY total_value DESC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [desc[0] for desc in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_FAIRNESS_SUMMARY, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
+
+
+def get_conflicts(estate_id: int) -> list:
+    """Return items with more than one pending claim, most contested first."""
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_CONFLICTS, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
+
+
+def get_status_bundle(estate_id: int) -> dict:
+    """
+    Fetch inventory, conflicts, and fairness for a status report.
+    The three queries are independent, so they run concurrently —
+    each on its own connection — instead of paying three round trips
+    back to back.
+    """
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        inventory = pool.submit(get_estate_inventory, estate_id)
+        conflicts = pool.submit(get_conflicts, estate_id)
+        fairness = pool.submit(get_fairness_summary, estate_id)
+        return {
+            'inventory': inventory.result(),
+            'conflicts': conflicts.result(),
+            'fairness': fairness.result(),
+        }
 
 
 # ── Audit Log & Intent Notes ──────────────────────────────────────────────────
 
-def init_audit_tables():
-    """Add audit_log and intent_notes tables."""
-    conn = get_connection()
+def init_audit_tables(conn=None):
+    """
+    Add audit_log and intent_notes tables.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_audit_tables(conn)
+    begin(conn)
     c = conn.cursor()
 
     if USE_POSTGRES:
@@ -718,8 +1280,22 @@ def init_audit_tables():
             )
         """)
 
-    conn.commit()
-    conn.close()
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_estate_created
+        ON audit_log(estate_id, created_at DESC)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_estate_item_created
+        ON audit_log(estate_id, item_id, created_at)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_item_member
+        ON intent_notes(item_id, member_id)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_item_vis
+        ON intent_notes(item_id, visibility)
+    """)
 
 
 def write_audit(
@@ -729,63 +1305,238 @@ def write_audit(
     public_summary: str,
     item_id: int = None,
     actor_id: int = None,
-    metadata: dict = None
+    metadata: dict = None,
+    conn=None
 ):
     """
     Write an audit log entry.
     public_summary is always visible to all family members.
-    metadata is JSON — structured data about the action (never sensitive).
+    metadata is JSON — structured data about the action (never sensitive);
+    stored as NULL when there is none.
+    Pass conn to write inside a caller's transaction; the caller commits.
+    Without conn the entry is queued and written in the background.
     """
-    conn = get_connection()
+    meta = json.dumps(metadata) if metadata else None
+    if conn is None:
+        _start_audit_writer()
+        _audit_queue.put((
+            estate_id, item_id, action_type, actor_id, actor_name,
+            public_summary, meta, _now_text()
+        ))
+        return
     c = conn.cursor()
-    now = datetime.now().isoformat()
-    meta = json.dumps(metadata or {})
+    execute_prepared(c, "write_audit", (
+        estate_id, item_id, action_type, actor_id,
+        actor_name, public_summary, meta
+    ))
+
+
+SQL_INSERT_AUDITS = (
+    "INSERT INTO audit_log (estate_id, item_id, action_type, actor_id, "
+    "actor_name, public_summary, metadata, created_at) "
+    + ("VALUES %s" if USE_POSTGRES else f"VALUES (?,?,?,?,?,?,?,{_NOW})")
+)
+VALUES_INSERT_AUDITS = f"(%s,%s,%s,%s,%s,%s,%s,{_NOW})"
+
+
+def write_audit_many(entries: list, conn=None):
+    """
+    Write several audit entries at once.
+    entries: list of dicts with write_audit's keyword arguments.
+    With conn they go in as one multi-row insert inside the caller's
+    transaction; without it each is queued as write_audit would.
+    """
+    if conn is None:
+        for e in entries:
+            write_audit(**e)
+        return
+    if not entries:
+        return
+    _insert_audit_rows(conn.cursor(), [
+        (e['estate_id'], e.get('item_id'), e['action_type'], e.get('actor_id'),
+         e['actor_name'], e['public_summary'],
+         json.dumps(e['metadata']) if e.get('metadata') else None)
+        for e in entries
+    ])
+
+
+def _insert_audit_rows(c, rows: list):
+    """Multi-row insert of (estate_id, ..., metadata) tuples, stamped by _NOW."""
     if USE_POSTGRES:
-        c.execute("""
-            INSERT INTO audit_log
-            (estate_id, item_id, action_type, actor_id, actor_name, public_summary, metadata, created_at)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-        """, (estate_id, item_id, action_type, actor_id, actor_name, public_summary, meta, now))
+        psycopg2.extras.execute_values(
+            c, SQL_INSERT_AUDITS, rows, template=VALUES_INSERT_AUDITS,
+            page_size=len(rows)
+        )
     else:
-        c.execute("""
-            INSERT INTO audit_log
-            (estate_id, item_id, action_type, actor_id, actor_name, public_summary, metadata, created_at)
-            VALUES (?,?,?,?,?,?,?,?)
-        """, (estate_id, item_id, action_type, actor_id, actor_name, public_summary, meta, now))
-    conn.commit()
-    conn.close()
+        c.executemany(SQL_INSERT_AUDITS, rows)
+
+
+def _now_text() -> str:
+    """datetime.now() in _NOW's format, for a stamp taken before the insert."""
+    return datetime.now().isoformat(
+        timespec='microseconds' if USE_POSTGRES else 'milliseconds'
+    )
+
+
+# Queued audit entries are written by one daemon thread in batches of up to
+# AUDIT_BATCH_SIZE, or whatever arrived within AUDIT_FLUSH_SECONDS of the
+# first. Each is stamped when queued, in _NOW's format and clock (Postgres
+# sessions run in the app's zone), so queued and inline entries interleave
+# by call time. A batch hitting a connection error is retried with backoff
+# up to AUDIT_MAX_ATTEMPTS times, then logged and given up on so flushes
+# can't wait forever.
+
+AUDIT_BATCH_SIZE = 50
+AUDIT_FLUSH_SECONDS = 0.1
+AUDIT_MAX_ATTEMPTS = 5
+AUDIT_FLUSH_TIMEOUT = 20
+SQL_INSERT_QUEUED_AUDITS = (
+    "INSERT INTO audit_log (estate_id, item_id, action_type, actor_id, "
+    "actor_name, public_summary, metadata, created_at) "
+    + ("VALUES %s" if USE_POSTGRES else "VALUES (?,?,?,?,?,?,?,?)")
+)
+_audit_queue = queue.Queue()
+_audit_writer = None
+_audit_lock = threading.Lock()
+
+
+def _start_audit_writer():
+    global _audit_writer
+    if _audit_writer is None:
+        with _audit_lock:
+            if _audit_writer is None:
+                _audit_writer = threading.Thread(
+                    target=_drain_audit_queue, name="audit-writer", daemon=True
+                )
+                _audit_writer.start()
+
+
+def _drain_audit_queue():
+    while True:
+        batch = [_audit_queue.get()]
+        deadline = time.monotonic() + AUDIT_FLUSH_SECONDS
+        while len(batch) < AUDIT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_audit_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write_audit_batch(batch)
+        finally:
+            for _ in batch:
+                _audit_queue.task_done()
+
+
+def _write_audit_batch(batch: list):
+    """
+    Write queued rows, retrying connection errors with backoff. A row the
+    database rejects outright is split out and logged so it can't hold
+    back the rest.
+    """
+    for attempt in range(1, AUDIT_MAX_ATTEMPTS + 1):
+        try:
+            with connection() as conn:
+                c = conn.cursor()
+                if USE_POSTGRES:
+                    psycopg2.extras.execute_values(
+                        c, SQL_INSERT_QUEUED_AUDITS, batch, page_size=len(batch)
+                    )
+                else:
+                    c.executemany(SQL_INSERT_QUEUED_AUDITS, batch)
+            return
+        except TRANSIENT_ERRORS as e:
+            if attempt == AUDIT_MAX_ATTEMPTS:
+                print(f"Audit write gave up after {attempt} attempts ({e}); "
+                      f"{len(batch)} entries not written: {batch}")
+                return
+            delay = 2 ** (attempt - 1)
+            print(f"Audit write failed, retrying {len(batch)} entries in {delay}s: {e}")
+            time.sleep(delay)
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"Audit entry rejected: {e} {batch[0]}")
+                return
+            for row in batch:
+                _write_audit_batch([row])
+            return
+
+
+@atexit.register
+def flush_audit(timeout: float = AUDIT_FLUSH_TIMEOUT) -> bool:
+    """
+    Wait up to timeout seconds for queued audit entries to be written.
+    Returns False if some were still pending.
+    """
+    deadline = time.monotonic() + timeout
+    with _audit_queue.all_tasks_done:
+        while _audit_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Audit flush timed out; {_audit_queue.unfinished_tasks} entries pending.")
+                return False
+            _audit_queue.all_tasks_done.wait(remaining)
+    return True
+
+
+SQL_ITEM_AUDIT_LOG = f"""
+    SELECT actor_name, action_type, public_summary, created_at
+    FROM audit_log
+    WHERE estate_id={_P} AND item_id={_P}
+    ORDER BY created_at ASC, id ASC
+    LIMIT {_P}
+"""
+SQL_ESTATE_AUDIT_LOG = f"""
+    SELECT actor_name, action_type, public_summary, created_at
+    FROM audit_log
+    WHERE estate_id={_P}
+    ORDER BY created_at DESC, id DESC
+    LIMIT {_P}
+"""
 
 
 def get_audit_log(estate_id: int, item_id: int = None, limit: int = 50) -> list:
     """
     Get audit log entries for an estate or a specific item.
     Always returns only public_summary — never metadata contents that are private.
+    Queued entries are flushed first so callers see their own writes;
+    a stalled writer delays the read by at most a couple of seconds.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    if item_id:
-        c.execute(f"""
-            SELECT actor_name, action_type, public_summary, created_at
-            FROM audit_log
-            WHERE estate_id={p} AND item_id={p}
-            ORDER BY created_at ASC
-            LIMIT {p}
-        """, (estate_id, item_id, limit))
-    else:
-        c.execute(f"""
-            SELECT actor_name, action_type, public_summary, created_at
-            FROM audit_log
-            WHERE estate_id={p}
-            ORDER BY created_at DESC
-            LIMIT {p}
-        """, (estate_id, limit))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+    flush_audit(timeout=2)
+    with connection() as conn:
+        c = conn.cursor()
+        if item_id:
+            c.execute(SQL_ITEM_AUDIT_LOG, (estate_id, item_id, limit))
+        else:
+            c.execute(SQL_ESTATE_AUDIT_LOG, (estate_id, limit))
+        rows = c.fetchall()
+    return as_dicts(rows)
+
+
+SQL_INSERT_NOTE = f"""
+    INSERT INTO intent_notes
+    (item_id, estate_id, member_id, member_name, content, visibility, created_at, updated_at)
+    VALUES ({_P},{_P},{_P},{_P},{_P},'private',{_NOW},{_NOW})
+""" + _RETURNING_ID
+# Ownership is part of the WHERE, so check and update can't race
+SQL_SET_NOTE_VISIBILITY = f"""
+    UPDATE intent_notes SET visibility={_P}, updated_at={_NOW}
+    WHERE id={_P} AND member_id={_P}
+"""
+# Unreadable notes never leave the database — not even a redacted
+# version. The audit log already surfaces that a note exists.
+SQL_READABLE_NOTES = f"""
+    SELECT id, member_id, member_name, content, visibility, created_at
+    FROM intent_notes
+    WHERE item_id={_P}
+      AND (member_id={_P}
+           OR visibility='public'
+           OR ({_P} AND visibility='morris')
+           OR ({_P} AND visibility='mediator'))
+    ORDER BY created_at ASC, id ASC
+"""
 
 
 def add_intent_note(
@@ -798,27 +1549,13 @@ def add_intent_note(
     """
     Add a private intent note. Always starts as 'private'.
     Content is never written to the audit log.
-    The audit log only records that a note was added.
+    The audit log only records that a note was added; the entry is queued
+    once the note has committed.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute("""
-            INSERT INTO intent_notes
-            (item_id, estate_id, member_id, member_name, content, visibility, created_at, updated_at)
-            VALUES (%s,%s,%s,%s,%s,'private',%s,%s) RETURNING id
-        """, (item_id, estate_id, member_id, member_name, content, now, now))
-        note_id = c.fetchone()[0]
-    else:
-        c.execute("""
-            INSERT INTO intent_notes
-            (item_id, estate_id, member_id, member_name, content, visibility, created_at, updated_at)
-            VALUES (?,?,?,?,'private',?,?)
-        """, (item_id, estate_id, member_id, member_name, content, now, now))
-        note_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_INSERT_NOTE, (item_id, estate_id, member_id, member_name, content))
+        note_id = inserted_id(c)
 
     # Audit: records existence only — never content
     write_audit(
@@ -851,24 +1588,13 @@ def set_note_visibility(
     if new_visibility not in valid:
         raise ValueError(f"Invalid visibility: {new_visibility}")
 
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    p = '%s' if USE_POSTGRES else '?'
-
-    # Verify ownership
-    c.execute(f"SELECT member_id FROM intent_notes WHERE id={p}", (note_id,))
-    row = c.fetchone()
-    if not row or row[0] != member_id:
-        conn.close()
-        raise PermissionError("Only the author can change note visibility.")
-
-    c.execute(
-        f"UPDATE intent_notes SET visibility={p}, updated_at={p} WHERE id={p}",
-        (new_visibility, now, note_id)
-    )
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_SET_NOTE_VISIBILITY, (new_visibility, note_id, member_id))
+        if c.rowcount == 0:
+            raise PermissionError(
+                "Only the author can change note visibility (or note not found)."
+            )
 
     # Audit the visibility change — no content revealed
     labels = {
@@ -901,49 +1627,25 @@ def get_intent_notes(
     - mediator sees: own notes + public + mediator-visible notes
     Content is never returned for notes the viewer isn't authorized to see.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT id, member_id, member_name, content, visibility, created_at
-        FROM intent_notes
-        WHERE item_id={p}
-        ORDER BY created_at ASC
-    """, (item_id,))
-    rows = c.fetchall()
-    conn.close()
-
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        notes = [dict(zip(cols, r)) for r in rows]
-    else:
-        notes = [dict(r) for r in rows]
-
-    result = []
-    for note in notes:
-        is_author = note['member_id'] == member_id
-        vis = note['visibility']
-
-        can_read = (
-            is_author or
-            vis == 'public' or
-            (is_morris and vis == 'morris') or
-            (is_mediator and vis == 'mediator')
-        )
-
-        if can_read:
-            result.append(note)
-        # If not authorized, don't include — not even a redacted version
-        # The audit log already surfaces that a note exists
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_READABLE_NOTES, (item_id, member_id, bool(is_morris), bool(is_mediator)))
+        rows = c.fetchall()
 
-    return result
+    return as_dicts(rows)
 
 
 # ── Item Suggestions ──────────────────────────────────────────────────────────
 
-def init_suggestions_table():
-    """Add item_suggestions table for executor review workflow."""
-    conn = get_connection()
+def init_suggestions_table(conn=None):
+    """
+    Add item_suggestions table for executor review workflow.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_suggestions_table(conn)
+    begin(conn)
     c = conn.cursor()
 
     if USE_POSTGRES:
@@ -964,9 +1666,15 @@ def init_suggestions_table():
                 reviewed_by TEXT,
                 reviewer_note TEXT,
                 created_at TEXT NOT NULL,
-                reviewed_at TEXT
+                reviewed_at TEXT,
+                notified_at TEXT
             )
         """)
+        # Tables created before notifications were tracked
+        c.execute("""
+            ALTER TABLE item_suggestions
+            ADD COLUMN IF NOT EXISTS notified_at TEXT
+        """)
     else:
         c.execute("""
             CREATE TABLE IF NOT EXISTS item_suggestions (
@@ -985,12 +1693,60 @@ def init_suggestions_table():
                 reviewed_by TEXT,
                 reviewer_note TEXT,
                 created_at TEXT NOT NULL,
-                reviewed_at TEXT
+                reviewed_at TEXT,
+                notified_at TEXT
             )
         """)
-
-    conn.commit()
-    conn.close()
+        c.execute("PRAGMA table_info(item_suggestions)")
+        if 'notified_at' not in {r['name'] for r in c.fetchall()}:
+            c.execute("ALTER TABLE item_suggestions ADD COLUMN notified_at TEXT")
+
+    # Serves the pending and unnotified lookups, including their ORDER BY
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sugg_pending
+        ON item_suggestions(estate_id, status, created_at)
+    """)
+
+
+SQL_INSERT_SUGGESTION = f"""
+    INSERT INTO item_suggestions
+    (estate_id, suggested_by_id, suggested_by_name, name, description,
+     location, category, estimated_value, photo_url, suggester_note, created_at)
+    VALUES ({_P},{_P},{_P},{_P},{_P},{_P},{_P},{_P},{_P},{_P},{_NOW})
+""" + _RETURNING_ID
+# Keyed by get_pending_suggestions' notified argument
+SQL_PENDING_SUGGESTIONS = {
+    flag: f"""
+    SELECT * FROM item_suggestions
+    WHERE estate_id={_P} AND status='pending'{cond}
+    ORDER BY created_at ASC
+"""
+    for flag, cond in (
+        (None, ""),
+        (False, " AND notified_at IS NULL"),
+        (True, " AND notified_at IS NOT NULL"),
+    )
+}
+SQL_MARK_SUGGESTIONS_NOTIFIED = f"UPDATE item_suggestions SET notified_at={_NOW} WHERE " + (
+    "id = ANY(%s)" if USE_POSTGRES else "id IN (SELECT value FROM json_each(?))"
+)
+SQL_SUGGESTION_SUMMARY = (
+    f"SELECT estate_id, suggested_by_name, name FROM item_suggestions WHERE id={_P}"
+)
+SQL_REVIEW_SUGGESTION = f"""
+    UPDATE item_suggestions
+    SET status={_P}, reviewed_by={_P}, reviewer_note={_P}, reviewed_at={_NOW}
+    WHERE id={_P}
+"""
+# The inventory row is built from the suggestion in the database, so
+# estate_id and photo_url never round-trip through Python.
+SQL_ITEM_FROM_SUGGESTION = f"""
+    INSERT INTO inventory_items
+    (estate_id, name, description, location, category, estimated_value,
+     photo_url, created_at, updated_at)
+    SELECT estate_id, {_P}, {_P}, {_P}, {_P}, {_P}, photo_url, {_NOW}, {_NOW}
+    FROM item_suggestions WHERE id={_P}
+""" + _RETURNING_ID
 
 
 def add_suggestion(
@@ -1006,48 +1762,37 @@ def add_suggestion(
     suggester_note: str = None
 ) -> int:
     """Add an item suggestion for executor review."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    if USE_POSTGRES:
-        c.execute("""
-            INSERT INTO item_suggestions
-            (estate_id, suggested_by_id, suggested_by_name, name, description,
-             location, category, estimated_value, photo_url, suggester_note, created_at)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id
-        """, (estate_id, suggested_by_id, suggested_by_name, name, description,
-              location, category, estimated_value, photo_url, suggester_note, now))
-        suggestion_id = c.fetchone()[0]
-    else:
-        c.execute("""
-            INSERT INTO item_suggestions
-            (estate_id, suggested_by_id, suggested_by_name, name, description,
-             location, category, estimated_value, photo_url, suggester_note, created_at)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?)
-        """, (estate_id, suggested_by_id, suggested_by_name, name, description,
-              location, category, estimated_value, photo_url, suggester_note, now))
-        suggestion_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_INSERT_SUGGESTION, (
+            estate_id, suggested_by_id, suggested_by_name, name, description,
+            location, category, estimated_value, photo_url, suggester_note
+        ))
+        suggestion_id = inserted_id(c)
     return suggestion_id
 
 
-def get_pending_suggestions(estate_id: int) -> list:
-    """Get all pending suggestions for an estate."""
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT * FROM item_suggestions
-        WHERE estate_id={p} AND status='pending'
-        ORDER BY created_at ASC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        return [dict(zip(cols, r)) for r in rows]
-    return [dict(r) for r in rows]
+def get_pending_suggestions(estate_id: int, notified: bool = None) -> list:
+    """
+    Get pending suggestions for an estate.
+    notified=False limits it to ones the executor hasn't been told about
+    yet, True to ones they have; None returns all.
+    """
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_PENDING_SUGGESTIONS[notified], (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
+
+
+def mark_suggestions_notified(suggestion_ids: list):
+    """Stamp notified_at on a batch of suggestions in one statement."""
+    if not suggestion_ids:
+        return
+    ids = list(suggestion_ids)
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_MARK_SUGGESTIONS_NOTIFIED, (ids if USE_POSTGRES else json.dumps(ids),))
 
 
 def approve_suggestion(
@@ -1063,67 +1808,45 @@ def approve_suggestion(
     """
     Approve a suggestion — updates the suggestion record and
     creates the item in inventory. Returns the new item_id.
+    Everything, audit entries included, commits as one transaction.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    p = '%s' if USE_POSTGRES else '?'
-
-    # Get suggestion
-    c.execute(f"SELECT * FROM item_suggestions WHERE id={p}", (suggestion_id,))
-    row = c.fetchone()
-    if USE_POSTGRES:
-        cols = [d[0] for d in c.description]
-        suggestion = dict(zip(cols, row))
-    else:
-        suggestion = dict(row)
-
-    # Mark approved
-    c.execute(f"""
-        UPDATE item_suggestions
-        SET status='approved', reviewed_by={p}, reviewer_note={p}, reviewed_at={p}
-        WHERE id={p}
-    """, (reviewed_by, reviewer_note, now, suggestion_id))
-
-    conn.commit()
-    conn.close()
-
-    # Add to inventory
-    item_id = add_item(
-        estate_id=suggestion['estate_id'],
-        name=name,
-        description=description,
-        location=location,
-        category=category,
-        estimated_value=estimated_value
-    )
-
-    # Update photo_url if present
-    if suggestion.get('photo_url'):
-        conn2 = get_connection()
-        c2 = conn2.cursor()
-        c2.execute(f"UPDATE inventory_items SET photo_url={p} WHERE id={p}",
-                   (suggestion['photo_url'], item_id))
-        conn2.commit()
-        conn2.close()
-
-    # Audit entries
-    write_audit(
-        estate_id=suggestion['estate_id'],
-        item_id=item_id,
-        actor_name=suggestion['suggested_by_name'],
-        action_type='item_suggested',
-        public_summary=f"{suggestion['suggested_by_name']} suggested '{name}' for the inventory.",
-        metadata={"suggestion_id": suggestion_id}
-    )
-    write_audit(
-        estate_id=suggestion['estate_id'],
-        item_id=item_id,
-        actor_name=reviewed_by,
-        action_type='item_approved',
-        public_summary=f"{reviewed_by} approved '{name}' — added to the inventory.",
-        metadata={"suggestion_id": suggestion_id, "reviewer_note": reviewer_note}
-    )
+    with connection() as conn:
+        c = conn.cursor()
+
+        # Only what the audit entries need; photo_url etc. stay in the db
+        c.execute(SQL_SUGGESTION_SUMMARY, (suggestion_id,))
+        suggestion = c.fetchone()
+        if suggestion is None:
+            raise ValueError(f"Suggestion {suggestion_id} not found")
+
+        # Mark approved
+        c.execute(SQL_REVIEW_SUGGESTION, ('approved', reviewed_by, reviewer_note, suggestion_id))
+
+        # Add to inventory, carrying the suggestion's photo_url across
+        c.execute(SQL_ITEM_FROM_SUGGESTION, (
+            name, description, location, category, estimated_value or 0, suggestion_id
+        ))
+        item_id = inserted_id(c)
+
+        # Audit entries, written in one statement
+        write_audit_many([
+            dict(
+                estate_id=suggestion['estate_id'],
+                item_id=item_id,
+                actor_name=suggestion['suggested_by_name'],
+                action_type='item_suggested',
+                public_summary=f"{suggestion['suggested_by_name']} suggested '{name}' for the inventory.",
+                metadata={"suggestion_id": suggestion_id},
+            ),
+            dict(
+                estate_id=suggestion['estate_id'],
+                item_id=item_id,
+                actor_name=reviewed_by,
+                action_type='item_approved',
+                public_summary=f"{reviewed_by} approved '{name}' — added to the inventory.",
+                metadata={"suggestion_id": suggestion_id, "reviewer_note": reviewer_note},
+            ),
+        ], conn=conn)
 
     return item_id
 
@@ -1134,31 +1857,23 @@ def reject_suggestion(
     reviewer_note: str = None
 ):
     """Reject a suggestion with an optional note."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    p = '%s' if USE_POSTGRES else '?'
-
-    c.execute(f"SELECT estate_id, suggested_by_name, name FROM item_suggestions WHERE id={p}",
-              (suggestion_id,))
-    row = c.fetchone()
-    estate_id, suggested_by_name, name = row[0], row[1], row[2]
-
-    c.execute(f"""
-        UPDATE item_suggestions
-        SET status='rejected', reviewed_by={p}, reviewer_note={p}, reviewed_at={p}
-        WHERE id={p}
-    """, (reviewed_by, reviewer_note, now, suggestion_id))
-    conn.commit()
-    conn.close()
-
-    write_audit(
-        estate_id=estate_id,
-        actor_name=reviewed_by,
-        action_type='suggestion_rejected',
-        public_summary=f"{reviewed_by} did not add '{name}' to the inventory.",
-        metadata={"suggestion_id": suggestion_id, "suggested_by": suggested_by_name}
-    )
+    with connection() as conn:
+        c = conn.cursor()
+
+        c.execute(SQL_SUGGESTION_SUMMARY, (suggestion_id,))
+        row = c.fetchone()
+        estate_id, suggested_by_name, name = row['estate_id'], row['suggested_by_name'], row['name']
+
+        c.execute(SQL_REVIEW_SUGGESTION, ('rejected', reviewed_by, reviewer_note, suggestion_id))
+
+        write_audit(
+            estate_id=estate_id,
+            actor_name=reviewed_by,
+            action_type='suggestion_rejected',
+            public_summary=f"{reviewed_by} did not add '{name}' to the inventory.",
+            metadata={"suggestion_id": suggestion_id, "suggested_by": suggested_by_name},
+            conn=conn
+        )
 
 
 # ── Estate Schedule & Steward ─────────────────────────────────────────────────
@@ -1183,9 +1898,15 @@ DEFAULT_DURATIONS_DAYS = {
 }
 
 
-def init_schedule_tables():
-    """Create estate_schedule, milestones, and timeline_alerts tables."""
-    conn = get_connection()
+def init_schedule_tables(conn=None):
+    """
+    Create estate_schedule, milestones, and timeline_alerts tables.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_schedule_tables(conn)
+    begin(conn)
     c = conn.cursor()
 
     if USE_POSTGRES:
@@ -1273,21 +1994,83 @@ def init_schedule_tables():
             )
         """)
 
-    conn.commit()
-    conn.close()
 
+SQL_GET_SCHEDULE = f"SELECT * FROM estate_schedule WHERE estate_id={_P}"
+SQL_UPDATE_SCHEDULE = f"""
+    UPDATE estate_schedule
+    SET target_end_date={_P}, urgency={_P}, legal_deadlines={_P},
+        notes={_P}, onboarding_complete={_P}, updated_at={_NOW}
+    WHERE estate_id={_P}
+"""
+SQL_INSERT_SCHEDULE = f"""
+    INSERT INTO estate_schedule
+    (estate_id, target_end_date, urgency, legal_deadlines,
+     notes, onboarding_complete, created_at, updated_at)
+    VALUES ({_P},{_P},{_P},{_P},{_P},{_P},{_NOW},{_NOW})
+"""
+SQL_UPSERT_MILESTONE = f"""
+    INSERT INTO milestones
+        (estate_id, key, label, target_date, status, notes, created_at)
+    VALUES (%s,%s,%s,%s,%s,%s,{_NOW})
+    ON CONFLICT (estate_id, key) DO UPDATE SET
+        label=EXCLUDED.label,
+        target_date=EXCLUDED.target_date,
+        status=EXCLUDED.status,
+        notes=EXCLUDED.notes
+""" if USE_POSTGRES else f"""
+    INSERT OR REPLACE INTO milestones
+        (estate_id, key, label, target_date, status, notes, created_at)
+    VALUES (?,?,?,?,?,?,{_NOW})
+"""
+SQL_GET_MILESTONES = f"""
+    SELECT * FROM milestones WHERE estate_id={_P}
+    ORDER BY target_date ASC NULLS LAST
+""" if USE_POSTGRES else f"""
+    SELECT * FROM milestones WHERE estate_id={_P}
+    ORDER BY CASE WHEN target_date IS NULL THEN 1 ELSE 0 END, target_date ASC
+"""
+SQL_COMPLETE_MILESTONE = f"""
+    UPDATE milestones
+    SET status='complete', completed_at={_NOW}, notes=COALESCE({_P}, notes)
+    WHERE estate_id={_P} AND key={_P}
+"""
+SQL_WRITE_ALERT = f"""
+    INSERT INTO timeline_alerts
+    (estate_id, alert_type, severity, message, detail, created_at)
+    VALUES ({_P},{_P},{_P},{_P},{_P},{_NOW})
+"""
+SQL_ACTIVE_ALERTS = f"""
+    SELECT * FROM timeline_alerts
+    WHERE estate_id={_P} AND resolved={_FALSE}
+    ORDER BY
+        CASE severity
+            WHEN 'critical' THEN 1
+            WHEN 'warning'  THEN 2
+            WHEN 'info'     THEN 3
+            ELSE 4
+        END,
+        created_at DESC
+"""
+SQL_RESOLVE_ALERT = f"""
+    UPDATE timeline_alerts
+    SET resolved={_TRUE}, resolved_at={_NOW}
+    WHERE id={_P}
+"""
+SQL_RESOLVE_ALERT_TYPE = f"""
+    UPDATE timeline_alerts
+    SET resolved={_TRUE}, resolved_at={_NOW}
+    WHERE estate_id={_P} AND alert_type={_P} AND resolved={_FALSE}
+"""
 
-def get_schedule(estate_id: int) -> dict:
-    conn = get_connection()
+
+def get_schedule(estate_id: int, conn=None) -> dict:
+    """Pass conn to read inside a caller's transaction."""
+    if conn is None:
+        with connection() as conn:
+            return get_schedule(estate_id, conn)
     c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"SELECT * FROM estate_schedule WHERE estate_id={p}", (estate_id,))
-    row = c.fetchone()
-    conn.close()
-    if not row:
-        return {}
-    cols = [d[0] for d in c.description]
-    return dict(zip(cols, row))
+    c.execute(SQL_GET_SCHEDULE, (estate_id,))
+    return as_dict(c.fetchone())
 
 
 def save_schedule(
@@ -1298,31 +2081,16 @@ def save_schedule(
     notes: str = None,
     onboarding_complete: bool = False
 ):
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
-
-    existing = get_schedule(estate_id)
-    if existing:
-        c.execute(f"""
-            UPDATE estate_schedule
-            SET target_end_date={p}, urgency={p}, legal_deadlines={p},
-                notes={p}, onboarding_complete={p}, updated_at={p}
-            WHERE estate_id={p}
-        """, (target_end_date, urgency, legal_deadlines, notes,
-              onboarding_complete, now, estate_id))
-    else:
-        c.execute(f"""
-            INSERT INTO estate_schedule
-            (estate_id, target_end_date, urgency, legal_deadlines,
-             notes, onboarding_complete, created_at, updated_at)
-            VALUES ({p},{p},{p},{p},{p},{p},{p},{p})
-        """, (estate_id, target_end_date, urgency, legal_deadlines,
-              notes, onboarding_complete, now, now))
+    with connection() as conn:
+        c = conn.cursor()
 
-    conn.commit()
-    conn.close()
+        existing = get_schedule(estate_id, conn)
+        if existing:
+            c.execute(SQL_UPDATE_SCHEDULE, (target_end_date, urgency, legal_deadlines, notes,
+                                            onboarding_complete, estate_id))
+        else:
+            c.execute(SQL_INSERT_SCHEDULE, (estate_id, target_end_date, urgency, legal_deadlines,
+                                            notes, onboarding_complete))
 
 
 def set_milestones(estate_id: int, milestones: list):
@@ -1330,69 +2098,27 @@ def set_milestones(estate_id: int, milestones: list):
     Upsert a list of milestone dicts:
     [{ key, label, target_date, status, notes }]
     """
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
-
-    for m in milestones:
-        if USE_POSTGRES:
-            c.execute("""
-                INSERT INTO milestones
-                    (estate_id, key, label, target_date, status, notes, created_at)
-                VALUES (%s,%s,%s,%s,%s,%s,%s)
-                ON CONFLICT (estate_id, key) DO UPDATE SET
-                    label=EXCLUDED.label,
-                    target_date=EXCLUDED.target_date,
-                    status=EXCLUDED.status,
-                    notes=EXCLUDED.notes
-            """, (estate_id, m['key'], m['label'],
-                  m.get('target_date'), m.get('status', 'pending'),
-                  m.get('notes'), now))
-        else:
-            c.execute("""
-                INSERT OR REPLACE INTO milestones
-                    (estate_id, key, label, target_date, status, notes, created_at)
-                VALUES (?,?,?,?,?,?,?)
-            """, (estate_id, m['key'], m['label'],
-                  m.get('target_date'), m.get('status', 'pending'),
-                  m.get('notes'), now))
+    with connection() as conn:
+        c = conn.cursor()
 
-    conn.commit()
-    conn.close()
+        for m in milestones:
+            c.execute(SQL_UPSERT_MILESTONE, (estate_id, m['key'], m['label'],
+                                             m.get('target_date'), m.get('status', 'pending'),
+                                             m.get('notes')))
 
 
 def get_milestones(estate_id: int) -> list:
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT * FROM milestones WHERE estate_id={p}
-        ORDER BY target_date ASC NULLS LAST
-    """ if USE_POSTGRES else f"""
-        SELECT * FROM milestones WHERE estate_id={p}
-        ORDER BY CASE WHEN target_date IS NULL THEN 1 ELSE 0 END, target_date ASC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if not rows:
-        return []
-    cols = [d[0] for d in c.description]
-    return [dict(zip(cols, r)) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_GET_MILESTONES, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
 
 
 def complete_milestone(estate_id: int, key: str, notes: str = None):
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
-    c.execute(f"""
-        UPDATE milestones
-        SET status='complete', completed_at={p}, notes=COALESCE({p}, notes)
-        WHERE estate_id={p} AND key={p}
-    """, (now, notes, estate_id, key))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_COMPLETE_MILESTONE, (notes, estate_id, key))
 
 
 def write_alert(
@@ -1402,86 +2128,120 @@ def write_alert(
     severity: str = 'info',
     detail: str = None
 ):
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
-    c.execute(f"""
-        INSERT INTO timeline_alerts
-        (estate_id, alert_type, severity, message, detail, created_at)
-        VALUES ({p},{p},{p},{p},{p},{p})
-    """, (estate_id, alert_type, severity, message, detail, now))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_WRITE_ALERT, (estate_id, alert_type, severity, message, detail))
 
 
 def get_active_alerts(estate_id: int) -> list:
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    c.execute(f"""
-        SELECT * FROM timeline_alerts
-        WHERE estate_id={p} AND resolved=FALSE
-        ORDER BY
-            CASE severity
-                WHEN 'critical' THEN 1
-                WHEN 'warning'  THEN 2
-                WHEN 'info'     THEN 3
-                ELSE 4
-            END,
-            created_at DESC
-    """ if USE_POSTGRES else f"""
-        SELECT * FROM timeline_alerts
-        WHERE estate_id={p} AND resolved=0
-        ORDER BY
-            CASE severity
-                WHEN 'critical' THEN 1
-                WHEN 'warning'  THEN 2
-                WHEN 'info'     THEN 3
-                ELSE 4
-            END,
-            created_at DESC
-    """, (estate_id,))
-    rows = c.fetchall()
-    conn.close()
-    if not rows:
-        return []
-    cols = [d[0] for d in c.description]
-    return [dict(zip(cols, r)) for r in rows]
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_ACTIVE_ALERTS, (estate_id,))
+        rows = c.fetchall()
+    return as_dicts(rows)
 
 
 def resolve_alert(alert_id: int):
-    conn = get_connection()
-    c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
-    c.execute(f"""
-        UPDATE timeline_alerts
-        SET resolved=TRUE, resolved_at={p}
-        WHERE id={p}
-    """ if USE_POSTGRES else f"""
-        UPDATE timeline_alerts
-        SET resolved=1, resolved_at={p}
-        WHERE id={p}
-    """, (now, alert_id))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_RESOLVE_ALERT, (alert_id,))
 
 
 def resolve_alert_type(estate_id: int, alert_type: str):
     """Resolve all active alerts of a given type for an estate."""
-    conn = get_connection()
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_RESOLVE_ALERT_TYPE, (estate_id, alert_type))
+
+
+# ── Failed Emails ─────────────────────────────────────────────────────────────
+# Emails Resend still refused after retrying, kept so they can be resent
+# instead of being lost.
+
+def init_email_tables(conn=None):
+    """
+    Create the failed_emails table.
+    Pass conn to run inside a caller's transaction; the caller commits.
+    """
+    if conn is None:
+        with connection() as conn:
+            return init_email_tables(conn)
+    begin(conn)
     c = conn.cursor()
-    p = '%s' if USE_POSTGRES else '?'
-    now = datetime.now().isoformat()
     c.execute(f"""
-        UPDATE timeline_alerts
-        SET resolved=TRUE, resolved_at={p}
-        WHERE estate_id={p} AND alert_type={p} AND resolved=FALSE
-    """ if USE_POSTGRES else f"""
-        UPDATE timeline_alerts
-        SET resolved=1, resolved_at={p}
-        WHERE estate_id={p} AND alert_type={p} AND resolved=0
-    """, (now, estate_id, alert_type))
-    conn.commit()
-    conn.close()
+        CREATE TABLE IF NOT EXISTS failed_emails (
+            id {'SERIAL PRIMARY KEY' if USE_POSTGRES else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
+            recipient TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            html TEXT NOT NULL,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            resent_at TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Tables created before resends were tracked
+    if USE_POSTGRES:
+        c.execute("""
+            ALTER TABLE failed_emails
+            ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0
+        """)
+    else:
+        c.execute("PRAGMA table_info(failed_emails)")
+        if 'attempts' not in {r['name'] for r in c.fetchall()}:
+            c.execute("ALTER TABLE failed_emails ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+
+SQL_INSERT_FAILED_EMAILS = (
+    "INSERT INTO failed_emails (recipient, subject, html, error, created_at) "
+    + ("VALUES %s" if USE_POSTGRES else f"VALUES (?,?,?,?,{_NOW})")
+)
+VALUES_INSERT_FAILED_EMAILS = f"(%s,%s,%s,%s,{_NOW})"
+
+
+def record_failed_emails(recipients: list, subject: str, html: str, error: str):
+    """Keep one failed_emails row per recipient of a send that gave up."""
+    if not recipients:
+        return
+    rows = [(r, subject, html, error) for r in recipients]
+    with connection() as conn:
+        c = conn.cursor()
+        if USE_POSTGRES:
+            psycopg2.extras.execute_values(
+                c, SQL_INSERT_FAILED_EMAILS, rows,
+                template=VALUES_INSERT_FAILED_EMAILS, page_size=len(rows)
+            )
+        else:
+            c.executemany(SQL_INSERT_FAILED_EMAILS, rows)
+
+
+SQL_UNSENT_FAILED_EMAILS = (
+    "SELECT id, recipient, subject, html, attempts FROM failed_emails "
+    f"WHERE resent_at IS NULL AND attempts < {_P} ORDER BY id LIMIT {_P}"
+)
+SQL_MARK_FAILED_EMAIL_RESENT = (
+    f"UPDATE failed_emails SET resent_at={_NOW}, attempts=attempts+1 WHERE id={_P}"
+)
+SQL_BUMP_FAILED_EMAIL = (
+    f"UPDATE failed_emails SET error={_P}, attempts=attempts+1 WHERE id={_P}"
+)
+
+
+def get_unsent_failed_emails(max_attempts: int, limit: int = 100) -> list:
+    """Failed sends that have not been resent and still have attempts left, oldest first."""
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(SQL_UNSENT_FAILED_EMAILS, (max_attempts, limit))
+        return [dict(r) for r in c.fetchall()]
+
+
+def mark_failed_email_resent(email_id: int):
+    """Stamp resent_at once a failed send has gone through."""
+    with connection() as conn:
+        conn.cursor().execute(SQL_MARK_FAILED_EMAIL_RESENT, (email_id,))
+
+
+def bump_failed_email(email_id: int, error: str):
+    """Record another failed resend so the row eventually stops being retried."""
+    with connection() as conn:
+        conn.cursor().execute(SQL_BUMP_FAILED_EMAIL, (error, email_id))
@@ -8,21 +8,26 @@ Jobs:
 """
 
 import os
-import time
+import signal
+import threading
 import pytz
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from dotenv import load_dotenv
 
 from db.database import (
-    init_db, init_family_tables, init_audit_tables,
-    get_pending_suggestions, get_connection, USE_POSTGRES,
-    init_schedule_tables, get_schedule
+    init_db, init_family_tables, init_tabulator_tables, init_audit_tables,
+    init_suggestions_table,
+    get_pending_suggestions, mark_suggestions_notified,
+    connection, get_connection, USE_POSTGRES,
+    init_schedule_tables, init_email_tables, get_schedule
 )
-from agents.crew import run_morning_briefing, run_suggestion_notification
+from agents.crew import run_morning_briefing, run_suggestion_notifications_batch
 from agents.steward import run_steward
 from agents.onboarding import start_onboarding
+from tools.email import resend_failed_emails
 
 load_dotenv()
 
@@ -33,10 +38,11 @@ ESTATE_ID     = int(os.getenv("FM_ESTATE_ID", "1"))
 ESTATE_NAME   = os.getenv("FM_ESTATE_NAME", "the estate")
 EXECUTOR_NAME = os.getenv("FM_EXECUTOR_NAME", "the executor")
 
-# Track which suggestions we've already notified about
-# (stored in memory — resets on restart, which is fine;
-#  suggestions have a 'notified' flag in the db)
-_notified_suggestion_ids = set()
+# Triggers are built once at import; both entry points share them.
+MORNING_TRIGGER    = CronTrigger(hour=9, minute=0, timezone=PT)     # 9:00 AM PT daily
+STEWARD_TRIGGER    = CronTrigger(hour=9, minute=30, timezone=PT)    # 9:30 AM PT, after the briefing
+SUGGESTION_TRIGGER = IntervalTrigger(minutes=10, timezone=PT)
+FAILED_EMAIL_TRIGGER = IntervalTrigger(hours=1, timezone=PT)
 
 
 def morning_job():
@@ -51,21 +57,20 @@ def morning_job():
 def suggestion_check_job():
     """
     Every 10 minutes — check for new pending suggestions.
-    Notify the executor via Morris for any we haven't flagged yet.
+    Morris sends one notification covering every suggestion without a
+    notified_at stamp, then stamps them — nothing is kept in memory, so a
+    restart doesn't re-announce old suggestions.
     """
     try:
-        pending = get_pending_suggestions(ESTATE_ID)
-        for suggestion in pending:
-            sid = suggestion.get('id')
-            if sid and sid not in _notified_suggestion_ids:
-                print(f"New suggestion: {suggestion['name']} from {suggestion['suggested_by_name']}")
-                run_suggestion_notification(
-                    estate_id=ESTATE_ID,
-                    estate_name=ESTATE_NAME,
-                    suggester_name=suggestion['suggested_by_name'],
-                    item_name=suggestion['name']
-                )
-                _notified_suggestion_ids.add(sid)
+        pending = get_pending_suggestions(ESTATE_ID, notified=False)
+        if pending:
+            print(f"{len(pending)} new suggestion(s)")
+            run_suggestion_notifications_batch(
+                estate_id=ESTATE_ID,
+                estate_name=ESTATE_NAME,
+                suggestions=pending
+            )
+            mark_suggestions_notified([s['id'] for s in pending])
     except Exception as e:
         print(f"Suggestion check error: {e}")
 
@@ -79,6 +84,14 @@ def steward_sweep_job():
         print(f"Steward sweep error: {e}")
 
 
+def failed_email_job():
+    """Hourly — resend emails that were parked in failed_emails."""
+    try:
+        resend_failed_emails()
+    except Exception as e:
+        print(f"Failed email resend error: {e}")
+
+
 def onboarding_check_job():
     """
     On startup and daily — check if the estate needs schedule onboarding.
@@ -94,52 +107,65 @@ def onboarding_check_job():
 
 
 def init_all():
-    """Initialize all database tables on startup."""
-    for fn_name, fn in [
-        ('init_db', init_db),
-        ('init_family_tables', init_family_tables),
-        ('init_audit_tables', init_audit_tables),
-        ('init_schedule_tables', init_schedule_tables),
-    ]:
-        try:
-            fn()
-        except Exception as e:
-            print(f"{fn_name} warning: {e}")
-
+    """
+    Initialize all database tables on startup, in one transaction —
+    a single commit, and no half-initialized schema if a step fails.
+    """
+    fn_name = None
+    try:
+        with connection() as conn:
+            for fn_name, fn in [
+                ('init_db', init_db),
+                ('init_family_tables', init_family_tables),
+                ('init_tabulator_tables', init_tabulator_tables),
+                ('init_audit_tables', init_audit_tables),
+                ('init_suggestions_table', init_suggestions_table),
+                ('init_schedule_tables', init_schedule_tables),
+                ('init_email_tables', init_email_tables),
+            ]:
+                fn(conn)
+    except Exception as e:
+        print(f"{fn_name} warning: {e}")
 
-if __name__ == "__main__":
-    init_all()
 
+def build_scheduler() -> BackgroundScheduler:
+    """The FM scheduler with every job registered, not yet started."""
     scheduler = BackgroundScheduler(timezone=PT)
-
-    # 9:00 AM Pacific Time daily
     scheduler.add_job(
         morning_job,
-        trigger=CronTrigger(hour=9, minute=0, timezone=PT),
+        trigger=MORNING_TRIGGER,
         id="morning_briefing",
         name="Morning Estate Briefing",
         replace_existing=True
     )
-
-    # Every 10 minutes — new suggestion check
+    scheduler.add_job(
+        steward_sweep_job,
+        trigger=STEWARD_TRIGGER,
+        id="steward_sweep",
+        name="Steward Daily Sweep",
+        replace_existing=True
+    )
     scheduler.add_job(
         suggestion_check_job,
-        trigger="interval",
-        minutes=10,
+        trigger=SUGGESTION_TRIGGER,
         id="suggestion_check",
         name="New Suggestion Check",
         replace_existing=True
     )
-
-    # 9:30 AM — Steward daily sweep (after morning briefing)
     scheduler.add_job(
-        steward_sweep_job,
-        trigger=CronTrigger(hour=9, minute=30, timezone=PT),
-        id="steward_sweep",
-        name="Steward Daily Sweep",
+        failed_email_job,
+        trigger=FAILED_EMAIL_TRIGGER,
+        id="failed_email_resend",
+        name="Failed Email Resend",
         replace_existing=True
     )
+    return scheduler
 
+
+if __name__ == "__main__":
+    init_all()
+
+    scheduler = build_scheduler()
     scheduler.start()
     print("✅ FM Scheduler running.")
     print(f"   Estate: {ESTATE_NAME} (ID: {ESTATE_ID})")
@@ -147,14 +173,16 @@ if __name__ == "__main__":
     print("   Morning briefing fires at 9:00 AM PT")
     print("   Steward sweep fires at 9:30 AM PT")
     print("   Suggestion check runs every 10 minutes")
+    print("   Failed emails are resent hourly")
     print("   Press Ctrl+C to stop.\n")
 
     # Check if onboarding needed
     onboarding_check_job()
 
-    try:
-        while True:
-            time.sleep(60)
-    except (KeyboardInterrupt, SystemExit):
-        scheduler.shutdown()
-        print("Scheduler stopped.")
+    # Block until SIGINT/SIGTERM instead of waking every minute
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    stop_event.wait()
+    scheduler.shutdown()
+    print("Scheduler stopped.")
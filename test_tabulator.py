@@ -11,13 +11,14 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from db.database import init_db, init_family_tables, init_tabulator_tables
+from db.database import init_db, init_family_tables, init_tabulator_tables, init_audit_tables
 from agents.tabulator import run_add_inventory, run_status_report, run_record_claim
 
 # Initialize all tables
 init_db()
 init_family_tables()
 init_tabulator_tables()
+init_audit_tables()
 
 ESTATE_ID = 1  # Use the estate created by test_host.py
 
@@ -4,61 +4,133 @@ Send emails via Resend from morris@familymatter.co
 """
 
 import os
-import resend
+import time
+import uuid
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
+from jinja2 import Environment, BaseLoader
+
+from db.database import (
+    record_failed_emails, get_unsent_failed_emails,
+    mark_failed_email_resent, bump_failed_email,
+)
 
 load_dotenv()
 
-resend.api_key = os.getenv("RESEND_API_KEY")
+RESEND_API = "https://api.resend.com"
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 FROM_ADDRESS = "Morris <morris@familymatter.co>"
 
-
-def send_email(to: str, subject: str, html: str) -> str:
+# Resend accepts up to 100 emails per batch call; RESEND_RPS is the plan's
+# request-per-second limit (2 on the free tier).
+RESEND_BATCH_SIZE = 100
+RESEND_RPS = float(os.getenv("RESEND_RPS", "2"))
+# Batch calls allowed in flight at once; the token bucket still caps the start rate.
+RESEND_CONCURRENCY = 5
+# Rate-limited or transient failures are retried with exponential backoff
+# (1s, 2s, 4s, ... capped at RESEND_BACKOFF_MAX) before giving up.
+RESEND_MAX_ATTEMPTS = 5
+RESEND_BACKOFF_MAX = 30
+# Parked failures get this many scheduled resends before they are left alone.
+RESEND_FAILED_MAX_ATTEMPTS = 5
+# Optional IDs of the invite/reminder bodies stored as Resend templates. When
+# set, only the ID and variables are sent (keys match the Jinja templates
+# below); unset falls back to rendering the HTML here.
+INVITE_TEMPLATE_ID = os.getenv("RESEND_INVITE_TEMPLATE_ID")
+REMINDER_TEMPLATE_ID = os.getenv("RESEND_REMINDER_TEMPLATE_ID")
+
+# Calls go straight to Resend's REST API over one pooled session, so sends
+# reuse keep-alive connections instead of a new TLS handshake each time.
+_session = requests.Session()
+_session.headers["Authorization"] = f"Bearer {RESEND_API_KEY}"
+_session.mount("https://", HTTPAdapter(pool_maxsize=RESEND_CONCURRENCY))
+
+# Token bucket shared by every send: holds up to a second's worth of calls
+# (at least one) and refills at RESEND_RPS. Taking a token from an empty
+# bucket drives it negative, which reserves the caller the next free slot.
+_bucket_lock = threading.Lock()
+_tokens = max(1.0, RESEND_RPS)
+_refilled = time.monotonic()
+
+
+def _pace():
+    """Take a Resend rate-limit token, sleeping until it is due."""
+    global _tokens, _refilled
+    with _bucket_lock:
+        now = time.monotonic()
+        _tokens = min(max(1.0, RESEND_RPS), _tokens + (now - _refilled) * RESEND_RPS)
+        _refilled = now
+        _tokens -= 1
+        wait = -_tokens / RESEND_RPS if _tokens < 0 else 0
+    if wait:
+        time.sleep(wait)
+
+
+def _retryable(e: Exception) -> bool:
+    """Rate limits, server errors and dropped connections are worth retrying."""
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(e.response, "status_code", 0) if isinstance(e, requests.HTTPError) else 0
+    return status == 429 or status >= 500
+
+
+def _post(path: str, payload, idempotency_key: str):
+    """POST to the Resend API; HTTP errors raise with Resend's message."""
+    response = _session.post(
+        f"{RESEND_API}{path}", json=payload, timeout=30,
+        headers={"Idempotency-Key": idempotency_key},
+    )
+    if response.status_code >= 400:
+        raise requests.HTTPError(f"{response.status_code}: {response.text}", response=response)
+    return response.json()
+
+
+def _call_resend(path: str, payload, idempotency_key: str = None):
     """
-    Send an email via Resend.
-    
-    Args:
-        to:      recipient email address
-        subject: email subject line
-        html:    HTML email body
+    Make one paced Resend call, retrying transient failures.
+    Every attempt carries the same Idempotency-Key, so a retry after a
+    timeout that Resend actually accepted doesn't send the email twice.
     """
+    idempotency_key = idempotency_key or str(uuid.uuid4())
+    delay = 1
+    for attempt in range(1, RESEND_MAX_ATTEMPTS + 1):
+        _pace()
+        try:
+            return _post(path, payload, idempotency_key)
+        except Exception as e:
+            if attempt == RESEND_MAX_ATTEMPTS or not _retryable(e):
+                raise
+            print(f"Resend attempt {attempt} failed ({e}); retrying in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RESEND_BACKOFF_MAX)
+
+
+def _keep_failed(recipients: list, subject: str, html: str, error: Exception):
+    """Park emails that still failed in failed_emails so they aren't lost."""
     try:
-        response = resend.Emails.send({
-            "from": FROM_ADDRESS,
-            "to": to,
-            "subject": subject,
-            "html": html
-        })
-        print(f"Email sent to {to}: {response['id']}")
-        return f"Email sent successfully to {to}."
+        record_failed_emails(recipients, subject, html, str(error))
     except Exception as e:
-        print(f"Email error: {e}")
-        return f"Failed to send email to {to}: {str(e)}"
+        print(f"Could not record failed email(s): {e}")
 
 
-def send_invitation_email(
-    to: str,
-    family_member_name: str,
-    deceased_name: str,
-    executor_name: str,
-    join_code: str
-) -> str:
-    """
-    Send a Family Matter invitation email to a family member.
-    """
-    subject = f"You've been invited to join the {deceased_name} Family Matter"
-
-    html = f"""
+# Email bodies are compiled once at import and rendered per send. Autoescape
+# keeps names and messages typed by family members from injecting markup;
+# the announcement keeps the message's line breaks via white-space: pre-line.
+INVITE_HTML = """
     <div style="font-family: Georgia, serif; max-width: 600px; margin: 0 auto; 
                 color: #2c2c2c; padding: 40px 20px;">
         
         <p style="font-size: 18px; color: #555; margin-bottom: 30px;">
-            Dear {family_member_name},
+            Dear {{ family_member_name }},
         </p>
 
         <p style="font-size: 16px; line-height: 1.7;">
-            My name is Morris. {executor_name} has asked me to help coordinate 
-            the distribution of {deceased_name}'s belongings, and they've invited 
+            My name is Morris. {{ executor_name }} has asked me to help coordinate 
+            the distribution of {{ deceased_name }}'s belongings, and they've invited 
             you to be part of this process.
         </p>
 
@@ -86,7 +158,7 @@ def send_invitation_email(
             </p>
             <p style="margin: 8px 0 0; font-size: 28px; font-weight: bold; 
                        letter-spacing: 4px; color: #2c2c2c;">
-                {join_code}
+                {{ join_code }}
             </p>
         </div>
 
@@ -104,32 +176,19 @@ def send_invitation_email(
         </p>
 
     </div>
-    """
-
-    return send_email(to, subject, html)
-
-
-def send_reminder_email(
-    to: str,
-    family_member_name: str,
-    deceased_name: str,
-    join_code: str,
-    days_since_invite: int
-) -> str:
-    """Send a gentle nudge to someone who hasn't joined yet."""
-    subject = f"A gentle reminder — {deceased_name} Family Matter"
+"""
 
-    html = f"""
+REMINDER_HTML = """
     <div style="font-family: Georgia, serif; max-width: 600px; margin: 0 auto;
                 color: #2c2c2c; padding: 40px 20px;">
 
         <p style="font-size: 18px; color: #555; margin-bottom: 30px;">
-            Dear {family_member_name},
+            Dear {{ family_member_name }},
         </p>
 
         <p style="font-size: 16px; line-height: 1.7;">
             Just a quiet note to let you know the invitation to join the 
-            {deceased_name} Family Matter is still open. There's no pressure — 
+            {{ deceased_name }} Family Matter is still open. There's no pressure — 
             these things move at their own pace.
         </p>
 
@@ -141,7 +200,7 @@ def send_reminder_email(
                     padding: 20px 25px; margin: 30px 0; border-radius: 4px;">
             <p style="margin: 0; font-size: 28px; font-weight: bold;
                        letter-spacing: 4px; color: #2c2c2c;">
-                {join_code}
+                {{ join_code }}
             </p>
         </div>
 
@@ -155,33 +214,18 @@ def send_reminder_email(
         </p>
 
     </div>
-    """
-
-    return send_email(to, subject, html)
-
+"""
 
-def send_group_announcement(
-    recipients: list,
-    subject: str,
-    message: str,
-    deceased_name: str
-) -> str:
-    """
-    Send a group announcement to all family members.
-    recipients: list of email addresses
-    """
-    html = f"""
+ANNOUNCEMENT_HTML = """
     <div style="font-family: Georgia, serif; max-width: 600px; margin: 0 auto;
                 color: #2c2c2c; padding: 40px 20px;">
 
         <p style="font-size: 14px; color: #888; text-transform: uppercase;
                    letter-spacing: 1px; margin-bottom: 20px;">
-            {deceased_name} Family Matter — Update
+            {{ deceased_name }} Family Matter — Update
         </p>
 
-        <div style="font-size: 16px; line-height: 1.8;">
-            {message}
-        </div>
+        <div style="font-size: 16px; line-height: 1.8; white-space: pre-line;">{{ message }}</div>
 
         <p style="font-size: 16px; margin-top: 40px; color: #555;">
             Morris<br>
@@ -189,11 +233,154 @@ def send_group_announcement(
         </p>
 
     </div>
+"""
+
+_env = Environment(loader=BaseLoader(), autoescape=True)
+_TEMPLATES = {
+    "invite": _env.from_string(INVITE_HTML),
+    "reminder": _env.from_string(REMINDER_HTML),
+    "announcement": _env.from_string(ANNOUNCEMENT_HTML),
+}
+
+
+def send_email(to: str, subject: str, html: str) -> str:
+    """
+    Send an email via Resend.
+    
+    Args:
+        to:      recipient email address
+        subject: email subject line
+        html:    HTML email body
     """
+    return _send(to, subject, {"html": html}, lambda: html)
+
 
-    results = []
-    for email in recipients:
-        result = send_email(email, subject, html)
-        results.append(result)
+def _send_template(to: str, subject: str, name: str, template_id: str, variables: dict) -> str:
+    """Send by hosted Resend template if configured, else render locally."""
+    render = partial(_TEMPLATES[name].render, **variables)
+    if not template_id:
+        return send_email(to, subject, render())
+    content = {"template": {"id": template_id, "variables": variables}}
+    return _send(to, subject, content, render)
 
-    return f"Announcement sent to {len(recipients)} family members."
+
+def _send(to: str, subject: str, content: dict, render) -> str:
+    """One Resend send; render() rebuilds the HTML to keep it if the send fails."""
+    try:
+        response = _call_resend("/emails", {
+            "from": FROM_ADDRESS,
+            "to": to,
+            "subject": subject,
+            **content
+        })
+        print(f"Email sent to {to}: {response['id']}")
+        return f"Email sent successfully to {to}."
+    except Exception as e:
+        print(f"Email error: {e}")
+        _keep_failed([to], subject, render(), e)
+        return f"Failed to send email to {to}: {str(e)}"
+
+
+def send_invitation_email(
+    to: str,
+    family_member_name: str,
+    deceased_name: str,
+    executor_name: str,
+    join_code: str
+) -> str:
+    """
+    Send a Family Matter invitation email to a family member.
+    """
+    subject = f"You've been invited to join the {deceased_name} Family Matter"
+
+    return _send_template(to, subject, "invite", INVITE_TEMPLATE_ID, {
+        "family_member_name": family_member_name,
+        "deceased_name": deceased_name,
+        "executor_name": executor_name,
+        "join_code": join_code,
+    })
+
+
+def send_reminder_email(
+    to: str,
+    family_member_name: str,
+    deceased_name: str,
+    join_code: str,
+    days_since_invite: int
+) -> str:
+    """Send a gentle nudge to someone who hasn't joined yet."""
+    subject = f"A gentle reminder — {deceased_name} Family Matter"
+
+    return _send_template(to, subject, "reminder", REMINDER_TEMPLATE_ID, {
+        "family_member_name": family_member_name,
+        "deceased_name": deceased_name,
+        "join_code": join_code,
+    })
+
+
+def send_group_announcement(
+    recipients: list,
+    subject: str,
+    message: str,
+    deceased_name: str
+) -> str:
+    """
+    Send a group announcement to all family members.
+    recipients: list of email addresses
+    """
+    html = _TEMPLATES["announcement"].render(
+        deceased_name=deceased_name,
+        message=message,
+    )
+
+    # One batch call per RESEND_BATCH_SIZE recipients, up to
+    # RESEND_CONCURRENCY in flight, started no faster than RESEND_RPS.
+    def send_chunk(chunk: list) -> int:
+        try:
+            _call_resend("/emails/batch", [
+                {"from": FROM_ADDRESS, "to": email, "subject": subject, "html": html}
+                for email in chunk
+            ])
+            return len(chunk)
+        except Exception as e:
+            print(f"Batch email error: {e}")
+            _keep_failed(chunk, subject, html, e)
+            return 0
+
+    chunks = [
+        recipients[start:start + RESEND_BATCH_SIZE]
+        for start in range(0, len(recipients), RESEND_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=RESEND_CONCURRENCY) as pool:
+        sent = sum(pool.map(send_chunk, chunks))
+    failed = len(recipients) - sent
+
+    print(f"Announcement: {sent} sent, {failed} failed")
+    if failed:
+        return f"Announcement sent to {sent} of {len(recipients)} family members; {failed} failed."
+    return f"Announcement sent to {sent} family members."
+
+
+def resend_failed_emails() -> str:
+    """
+    Retry emails parked in failed_emails, oldest first. Each row keeps one
+    Idempotency-Key across runs, so a resend Resend already took isn't repeated.
+    """
+    rows = get_unsent_failed_emails(RESEND_FAILED_MAX_ATTEMPTS)
+    sent = 0
+    for row in rows:
+        try:
+            _call_resend("/emails", {
+                "from": FROM_ADDRESS,
+                "to": row["recipient"],
+                "subject": row["subject"],
+                "html": row["html"],
+            }, idempotency_key=f"failed-email-{row['id']}")
+            mark_failed_email_resent(row["id"])
+            sent += 1
+        except Exception as e:
+            print(f"Resend of failed email {row['id']} failed: {e}")
+            bump_failed_email(row["id"], str(e))
+
+    print(f"Failed emails: {sent} of {len(rows)} resent")
+    return f"Resent {sent} of {len(rows)} failed emails."
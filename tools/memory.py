@@ -3,7 +3,9 @@ tools/memory.py
 Reads and writes user memory entries using the database layer.
 """
 
-from db.database import write_memory_to_db, read_memories
+from db.database import write_memory_to_db, read_memory_lines, cache_get, cache_put
+
+__all__ = ["write_memory", "read_recent_memories", "read_preferences"]
 
 
 def write_memory(event_type: str, summary: str, metadata: dict = None):
@@ -13,23 +15,22 @@ def write_memory(event_type: str, summary: str, metadata: dict = None):
 
 def read_recent_memories(limit: int = 10) -> str:
     """Read recent memories as a formatted string for agent context."""
-    rows = read_memories(limit=limit)
-    if not rows:
-        return "No previous interactions on record."
-    entries = []
-    for row in rows:
-        date = row["created_at"][:10]
-        entries.append(f"[{date}] {row['event_type'].upper()}: {row['summary']}")
-    return "\n".join(entries)
+    # Agents rebuild this context every turn; writes drop ('memories', ...) keys
+    key = ('memories', 'recent', limit)
+    text = cache_get(key)
+    if text is None:
+        text = "\n".join(read_memory_lines(limit=limit)) or "No previous interactions on record."
+        cache_put(key, text)
+    return text
 
 
 def read_preferences() -> str:
     """Read preference and activity memories."""
-    rows = read_memories(limit=20, types=["preference", "feedback", "attended"])
-    if not rows:
-        return "No preferences recorded yet."
-    entries = []
-    for row in rows:
-        date = row["created_at"][:10]
-        entries.append(f"[{date}] {row['summary']}")
-    return "\n".join(entries)
+    key = ('memories', 'preferences')
+    text = cache_get(key)
+    if text is None:
+        text = "\n".join(read_memory_lines(
+            limit=20, types=["preference", "feedback", "attended"], show_type=False
+        )) or "No preferences recorded yet."
+        cache_put(key, text)
+    return text
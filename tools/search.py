@@ -4,11 +4,37 @@ Web search tool for finding local events using Tavily.
 """
 
 import os
+import re
+import threading
+import time
+from jinja2 import Environment
 from tavily import TavilyClient
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Tavily results for the same query barely move within a few minutes, and
+# the agent often re-asks while refining a plan. Expired entries are pruned
+# whenever a new result is stored.
+SEARCH_CACHE_SECONDS = 600
+_results = {}
+_results_lock = threading.Lock()
+LOCATION = os.getenv("MY_LOCATION", "Shelter Island, NY")
+
+# Results go out in Telegram's legacy Markdown, which has no escape
+# character, so titles and snippets drop the characters that would open or
+# break an entity (e.g. a stray "*").
+_env = Environment()
+_env.filters["md"] = lambda text: re.sub(r"[_*`\[]", "", str(text))
+_RESULTS_TMPL = _env.from_string(
+    "{% for r in results %}"
+    "{{ loop.index }}. *{{ r.title | default('Untitled') | md }}*\n"
+    "   {{ (r.content | default(''))[:200] | md }}\n"
+    "   {{ r.url | default('') }}"
+    "{% if not loop.last %}\n\n{% endif %}"
+    "{% endfor %}"
+)
+
 _tavily = None
 
 
@@ -19,34 +45,38 @@ def get_tavily():
     return _tavily
 
 
-def search_local_events(query: str) -> str:
+def search_local_events(query: str, deep: bool = False) -> str:
     """
     Search the web for local events matching the user's request.
 
     Args:
         query: What the user wants to do (e.g. 'live music tonight')
+        deep:  use Tavily's slower "advanced" search depth
     """
-    location = os.getenv("MY_LOCATION", "Shelter Island, NY")
-    full_query = f"{query} near {location} today tonight"
+    full_query = f"{query} near {LOCATION} today tonight"
+
+    key = (" ".join(full_query.lower().split()), deep)
+    with _results_lock:
+        hit = _results.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
 
     print(f"Searching: {full_query}")
     client = get_tavily()
 
     results = client.search(
         query=full_query,
-        search_depth="advanced",
+        search_depth="advanced" if deep else "basic",
         max_results=5
     )
 
     if not results.get("results"):
         return "No events found matching that description."
 
-    formatted = []
-    for i, r in enumerate(results["results"], 1):
-        formatted.append(
-            f"{i}. *{r.get('title', 'Untitled')}*\n"
-            f"   {r.get('content', '')[:200]}\n"
-            f"   {r.get('url', '')}"
-        )
-
-    return "\n\n".join(formatted)
+    formatted = _RESULTS_TMPL.render(results=results["results"])
+    now = time.monotonic()
+    with _results_lock:
+        for k in [k for k, (expires, _) in _results.items() if expires <= now]:
+            del _results[k]
+        _results[key] = (now + SEARCH_CACHE_SECONDS, formatted)
+    return formatted
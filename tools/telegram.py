@@ -7,10 +7,28 @@ Replaces the Twilio SMS helper.
 import os
 import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Read once at import, after load_dotenv
+BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+API_BASE = f"https://api.telegram.org/bot{BOT_TOKEN}"
+SEND_URL = f"{API_BASE}/sendMessage"
+UPDATES_URL = f"{API_BASE}/getUpdates"
+
+# One pooled session so the poll loop and sends reuse the TLS connection
+# to api.telegram.org instead of handshaking on every call.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+))
+
 
 def send_message(message: str) -> str:
     """
@@ -18,17 +36,13 @@ def send_message(message: str) -> str:
     Uses the synchronous requests library so it plays
     nicely inside CrewAI tasks.
     """
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
-        "chat_id": chat_id,
+        "chat_id": CHAT_ID,
         "text": message,
         "parse_mode": "Markdown"
     }
 
-    response = requests.post(url, json=payload, timeout=10)
+    response = _session.post(SEND_URL, json=payload, timeout=10)
     result = response.json()
 
     if result.get("ok"):
@@ -40,38 +54,34 @@ def send_message(message: str) -> str:
         return f"Failed to send message: {error}"
 
 
-def get_latest_message() -> dict:
+def get_new_messages(offset: int = None, timeout: int = 25) -> list:
     """
-    Poll for the most recent message from the user.
+    Poll for new messages from the user, oldest first.
     Used by the webhook poller to check for replies.
-    Returns dict with 'text' and 'update_id' or empty dict.
+    Long-polls: Telegram holds the request open for up to `timeout` seconds
+    until an update arrives. Passing offset (last update_id + 1) also
+    acknowledges every earlier update, so they aren't returned again.
+    Returns a list of dicts with 'update_id' and 'text' (empty if none).
     """
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    url = f"https://api.telegram.org/bot{token}/getUpdates"
-
-    response = requests.get(url, params={"limit": 10, "timeout": 5}, timeout=15)
+    params = {"limit": 10, "timeout": timeout}
+    if offset is not None:
+        params["offset"] = offset
+    # Read timeout must outlast the server-side long-poll
+    response = _session.get(UPDATES_URL, params=params, timeout=timeout + 5)
     result = response.json()
 
-    if not result.get("ok") or not result.get("result"):
-        return {}
+    if not result.get("ok"):
+        return []
 
-    # Return the most recent message
-    updates = result["result"]
-    latest = updates[-1]
-    message = latest.get("message", {})
-    return {
-        "update_id": latest.get("update_id"),
-        "text": message.get("text", ""),
-        "from": message.get("from", {}).get("first_name", ""),
-        "chat_id": message.get("chat", {}).get("id")
-    }
-
-
-def clear_updates(up_to_update_id: int):
-    """
-    Tell Telegram we've processed updates up to this ID
-    so they don't show up again in getUpdates.
-    """
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    url = f"https://api.telegram.org/bot{token}/getUpdates"
-    requests.get(url, params={"offset": up_to_update_id + 1, "timeout": 1}, timeout=10)
+    # Every update is returned, even non-message ones, so the caller's
+    # offset moves past all of them
+    messages = []
+    for update in result.get("result", []):
+        message = update.get("message", {})
+        messages.append({
+            "update_id": update.get("update_id"),
+            "text": message.get("text", ""),
+            "from": message.get("from", {}).get("first_name", ""),
+            "chat_id": message.get("chat", {}).get("id")
+        })
+    return messages
@@ -7,11 +7,13 @@ No complex state machine needed — Morris is always in conversation mode.
 """
 
 import os
-import time
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from db.database import init_db
-from tools.telegram import get_latest_message, clear_updates, send_message
+from tools.telegram import get_new_messages, send_message
 from agents.crew import run_executor_reply
 from agents.onboarding import handle_onboarding_reply
 from db.database import get_schedule
@@ -24,6 +26,21 @@ EXECUTOR_NAME = os.getenv("FM_EXECUTOR_NAME", "the executor")
 
 last_update_id = None
 
+# Replies can take many seconds of LLM time, so they run off the poll
+# thread, which keeps long-polling meanwhile. There is a single reply worker:
+# handle_message reads and advances the one global conversation_state row,
+# and every reply goes to the executor's CHAT_ID, so messages are handled
+# strictly one at a time, in arrival order.
+#
+# Updates are acknowledged (via the next offset) when fetched, not when
+# answered, so delivery is at-most-once: on SIGINT/SIGTERM the poller stops
+# and waits for queued replies, but a message still queued when the process
+# is killed outright is not redelivered.
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reply")
+
+# Set on SIGINT/SIGTERM; the poll loop exits after the current long-poll.
+stop_event = threading.Event()
+
 
 def handle_message(text: str):
     """Route executor message — onboarding if in progress, otherwise Morris Q&A."""
@@ -63,33 +80,44 @@ def handle_message(text: str):
         )
 
 
-def poll():
-    global last_update_id
+def dispatch(text: str):
+    """Queue text behind any messages still waiting for a reply."""
+    _pool.submit(handle_message, text).add_done_callback(_log_failure)
 
-    update = get_latest_message()
-    if not update:
-        return
 
-    update_id = update.get("update_id")
-    text = update.get("text", "").strip()
+def _log_failure(future):
+    if future.exception() is not None:
+        print(f"Message handling error: {future.exception()}")
 
-    if update_id == last_update_id:
-        return
 
-    # Skip bot commands
-    if text.startswith("/"):
-        clear_updates(update_id)
-        last_update_id = update_id
-        return
+def _stop(signum, frame):
+    stop_event.set()
 
-    if text:
-        handle_message(text)
 
-    clear_updates(update_id)
-    last_update_id = update_id
+def poll():
+    """
+    Wait for new messages and handle each in order. Blocks in the long-poll
+    while idle; the offset acknowledges everything up to the last update
+    we handled.
+    """
+    global last_update_id
+
+    offset = last_update_id + 1 if last_update_id is not None else None
+    for update in get_new_messages(offset=offset):
+        last_update_id = update["update_id"]
+        text = update.get("text", "").strip()
+
+        # Skip bot commands
+        if text.startswith("/"):
+            continue
+
+        if text:
+            dispatch(text)
 
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
     init_db()
     print("✅ FM Telegram listener running.")
     print(f"   Estate: {ESTATE_NAME} (ID: {ESTATE_ID})")
@@ -97,9 +125,14 @@ if __name__ == "__main__":
     print("   All executor messages routed to Morris.")
     print("   Press Ctrl+C to stop.\n")
 
-    while True:
+    while not stop_event.is_set():
         try:
             poll()
         except Exception as e:
             print(f"Poll error: {e}")
-        time.sleep(2)
+            # Back off so an outage doesn't turn into a tight retry loop
+            stop_event.wait(2)
+
+    # Answer what was already acknowledged before exiting
+    _pool.shutdown(wait=True)
+    print("FM Telegram listener stopped.")